@@ -1,5 +1,11 @@
-from maze.gui import show_gui
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # headless commands never load the GUI toolkits
+        from maze.cli import main
+        sys.exit(main(sys.argv[1:]))
+
+    from maze.gui import show_gui
     gui, root = show_gui()
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
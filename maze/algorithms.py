@@ -1,388 +1,409 @@
-from heapq import heappush, heappop
-from collections import deque
+import queue
+import threading
+from array import array
+from contextlib import nullcontext
+from time import perf_counter
 
-from maze.utils import manhattan_distance, delay_step, is_in_bounds
+from maze.events import VISIT, PUSH, PUSH_BACK, PATH, unpack_event
 
 SEARCH_COLOR2 = "#FFB74A"
 SEARCH_COLOR = "#26BEFA"
 PATH_COLOR = "#E3FC00"
 
-
-def _maybe_pause(pause_wait):
-    if pause_wait:
-        pause_wait()
-
-def bfs(grid, start, end, canvas_rectangles, canvas, stop_flag, delay_value, dirs, pause_wait=None):
-    rows, cols = len(grid), len(grid[0])
-    queue = deque([start])
-    visited = set([start])
-    parents = {}
-
-    while queue:
-        if stop_flag():
-            return False
-
-        _maybe_pause(pause_wait)
-        if stop_flag():
-            return False
-
-        r, c = queue.popleft()
-        if (r, c) == end:
-            path_length = reconstruct_path(
-                parents, start, end, canvas_rectangles, canvas, delay_value, stop_flag, pause_wait
-            )
-            return len(visited), path_length
-
-        for dr, dc in dirs:
-            nr, nc = r + dr, c + dc
-            if is_in_bounds(nr, nc, rows, cols):
-                if grid[nr][nc] == 0 and (nr, nc) not in visited:
-                    visited.add((nr, nc))
-                    queue.append((nr, nc))
-                    parents[(nr, nc)] = (r, c)
-
-                    if (nr, nc) != end:
-                        canvas.itemconfig(canvas_rectangles[nr][nc], fill=SEARCH_COLOR)
-                        delay_step(canvas, delay_value)
-                        _maybe_pause(pause_wait)
-                    if stop_flag():
-                        return False
-
-    return False
-
-def a_star(grid, start, end, canvas_rectangles, canvas, stop_flag, delay_value, dirs, heuristic=manhattan_distance, pause_wait=None):
-    rows, cols = len(grid), len(grid[0])
-    open_set = []
-    heappush(open_set, (heuristic(start, end), 0, start))
-
-    parents = {}
-    g_score = {start: 0}
-    visited = set()
-
-    while open_set:
-        if stop_flag():
-            return False
-
-        _maybe_pause(pause_wait)
-        if stop_flag():
-            return False
-
-        _, current_g, current = heappop(open_set)
-        if current == end:
-            path_length = reconstruct_path(
-                parents, start, end, canvas_rectangles, canvas, delay_value, stop_flag, pause_wait
-            )
-            return len(visited), path_length
-
-        if current in visited:
-            continue
-        visited.add(current)
-
-        r, c = current
-        for dr, dc in dirs:
-            nr, nc = r + dr, c + dc
-            neighbor = (nr, nc)
-
-            if is_in_bounds(nr, nc, rows, cols) and grid[nr][nc] == 0:
-                tentative_g = g_score[current] + 1
-
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    g_score[neighbor] = tentative_g
-                    f_score = tentative_g + heuristic(neighbor, end)
-                    heappush(open_set, (f_score, tentative_g, neighbor))
-                    parents[neighbor] = current
-
-                    if neighbor != end:
-                        canvas.itemconfig(canvas_rectangles[nr][nc], fill=SEARCH_COLOR)
-                        if stop_flag():
-                            return False
-                        delay_step(canvas, delay_value)
-                        _maybe_pause(pause_wait)
-                        if stop_flag():
-                            return False
-
-    return False
-
-def bidirectional_bfs(grid, start, end, canvas_rectangles, canvas, stop_flag, delay_value, dirs, pause_wait=None):
-    rows, cols = len(grid), len(grid[0])
-
-    if start == end:
-        return True
-
-    queue_start = deque([start])
-    queue_end = deque([end])
-
-    visited_start = {start}
-    visited_end = {end}
-
-    parents_start = {}
-    parents_end = {}
-
-    meeting_point = None
-
-    while queue_start and queue_end:
-        if stop_flag():
-            return False
-
-        _maybe_pause(pause_wait)
-        if stop_flag():
-            return False
-
-        if queue_start:
-            curr = queue_start.popleft()
-            if curr in visited_end:
-                meeting_point = curr
-                break
-
-            for dr, dc in dirs:
-                nr, nc = curr[0] + dr, curr[1] + dc
-                nb = (nr, nc)
-                if is_in_bounds(nr, nc, rows, cols) and grid[nr][nc] == 0 and nb not in visited_start:
-                    visited_start.add(nb)
-                    queue_start.append(nb)
-                    parents_start[nb] = curr
-
-                    if nb != end and nb != start:
-                        canvas.itemconfig(canvas_rectangles[nr][nc], fill=SEARCH_COLOR)
-                        if stop_flag():
-                            return False
-                        delay_step(canvas, delay_value)
-                        _maybe_pause(pause_wait)
-                        if stop_flag():
-                            return False
-
-        if queue_end:
-            curr = queue_end.popleft()
-            if curr in visited_start:
-                meeting_point = curr
+# target frames per second of the event-loop renderer
+FRAME_RATE = 60
+# painted events per chunk a SearchWorker hands over, and how many chunks it may run ahead
+WORKER_CHUNK = 256
+WORKER_AHEAD = 64
+
+EVENT_COLORS = {
+    PUSH: SEARCH_COLOR,
+    PUSH_BACK: SEARCH_COLOR2,
+    PATH: PATH_COLOR,
+}
+
+
+class FrameRenderer:
+    """Queues cell colors and applies them to a cell surface (maze.cells) once per frame.
+
+    A cell painted twice before a flush is set once, with its last color.
+    """
+
+    def __init__(self, canvas, cells):
+        self.canvas = canvas
+        self.cells = cells
+        self.pending = {}
+
+    def paint(self, index, color):
+        self.pending[index] = color
+
+    def flush(self):
+        """Apply the queued colors and let Tk redraw; returns how many cells changed."""
+        pending = self.pending
+        if not pending:
+            return 0
+        cells = self.cells
+        for index, color in pending.items():
+            cells.set(index, color)
+        cells.flush()
+        count = len(pending)
+        pending.clear()
+        self.canvas.update_idletasks()
+        return count
+
+
+class SearchWorker:
+    """Runs a solver's step generator on a daemon thread and streams its painted events.
+
+    Queue items are (codes, times) chunks: pack_event() codes, with
+    expansions and the endpoints dropped, and each event's time in
+    microseconds of solver time (`compute` so far) when it was emitted. The queue holds at
+    most `ahead` chunks, so the worker stays a bounded distance ahead of
+    the painter and sleeps in put() when it gets there. After the last
+    chunk it sets `result`, `compute` (perf_counter() seconds spent in the
+    solver's next(), so queue waits don't count) and `error`, then queues
+    None. `prepare`, if given, runs on the worker thread before any timing,
+    to build structures shared by every solver (such as the grid's graph)
+    so the first run of a comparison doesn't pay for them alone; if it
+    returns False the search is skipped and `result` stays None.
+
+    pause() parks the thread on an Event at the next chunk, using no CPU;
+    stop() ends it even while paused or blocked. A stopped worker closes
+    the generator on its own thread before it exits; stop(wait=True) waits
+    for that, which matters before the grid changes or another run uses
+    the grid's derived structures. `context` is entered on
+    the worker thread around the run, for tools that only see the thread
+    that enters them, such as maze.profiling.profiled(); `context_value`
+    is what it yielded.
+    """
+
+    def __init__(self, steps, start, end, cols, context=None, chunk=WORKER_CHUNK, ahead=WORKER_AHEAD, prepare=None):
+        self.steps = steps
+        self.prepare = prepare
+        self.skip = (start[0] * cols + start[1], end[0] * cols + end[1])
+        self.context = context
+        self.context_value = None
+        self.chunk = chunk
+        self.queue = queue.Queue(maxsize=ahead)
+        self.running = threading.Event()
+        self.running.set()
+        self.stopped = threading.Event()
+        self.result = None
+        self.compute = 0.0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="search-worker", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def pause(self):
+        self.running.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def stop(self, wait=True):
+        """End the run; with `wait`, return only once the thread has exited."""
+        self.stopped.set()
+        self.running.set()
+        while True:
+            # free a put() blocked on a full queue; the worker sees `stopped` right after
+            try:
+                while True:
+                    self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if not (wait and self.thread.is_alive()):
+                return
+            self.thread.join(0.05)
+
+    def _run(self):
+        try:
+            with self.context if self.context is not None else nullcontext() as value:
+                self.context_value = value
+                if self.prepare is None or self.prepare() is not False:
+                    self._search()
+        except Exception as e:
+            self.error = e
+        finally:
+            # a generator can only be closed by the thread that runs it
+            self.steps.close()
+        if not self.stopped.is_set():
+            self.queue.put(None)
+
+    def _search(self):
+        advance, skip, size = self.steps.__next__, self.skip, self.chunk
+        clock = perf_counter
+        while True:
+            if not self.running.is_set():
+                self.running.wait()
+            if self.stopped.is_set():
+                return
+            codes, times = array("i"), array("Q")
+            t0 = clock()
+            # an event's time is the solver time before this chunk plus the time into it
+            offset = self.compute - t0
+            try:
+                while len(codes) < size:
+                    kind, index = advance()
+                    # expansions are already shown by the push that discovered them
+                    if kind != VISIT and index not in skip:
+                        codes.append(index << 2 | kind)
+                        times.append(int((clock() + offset) * 1e6))
+            except StopIteration as done:
+                self.compute += clock() - t0
+                self.result = done.value
+                if codes:
+                    self.queue.put((codes, times))
+                return
+            self.compute += clock() - t0
+            self.queue.put((codes, times))
+
+
+class FrameAnimation:
+    """Paints a search from the Tk event loop while a SearchWorker runs the solver.
+
+    Each after() frame drains a budget of painted cells from the worker's
+    queue and flushes them through a FrameRenderer, so the app never
+    blocks and Tk redraws once per frame rather than once per cell.
+    `delay_value` keeps its meaning of milliseconds per painted cell: a
+    frame of 1000/fps ms paints frame/delay cells (fractions carry over).
+    At delay 0 each frame paints whatever the solver has produced, for up
+    to most of the frame time.
+
+    pause() parks the worker and schedules no frames until resume(), so a
+    paused run costs nothing; stop() ends the run and, unless
+    wait=False, returns once the worker has let go of the solver (see
+    SearchWorker). on_done(outcome)
+    is called once, with (visited, path_length), or False when no path was
+    found or the run was stopped (or stop_flag() turned true). If `record`
+    is an array('i'), every painted event is appended to it packed. If
+    `timings` is a dict, it receives the seconds, unrounded, even if the run
+    stops: "compute" is the worker's solver time, "render" the
+    painting, "delay" the idle time between frames and "pause" the time
+    spent paused.
+    If `times` is an array('Q'), each recorded event's time in
+    microseconds goes into it (see maze.trace). `context` and `prepare` are
+    passed to the SearchWorker.
+    """
+
+    def __init__(self, steps, start, end, cells, canvas, stop_flag, delay_value, on_done,
+                 record=None, timings=None, fps=FRAME_RATE, times=None, context=None, prepare=None):
+        self.worker = SearchWorker(steps, start, end, cells.cols, context, prepare=prepare)
+        self.canvas = canvas
+        self.renderer = FrameRenderer(canvas, cells)
+        self.stop_flag = stop_flag
+        self.delay_value = delay_value
+        self.on_done = on_done
+        self.record = record
+        self.times = times
+        self.timings = {} if timings is None else timings
+        self.timings.update(compute=0.0, render=0.0, delay=0.0, pause=0.0)
+        self.frame = 1 / fps
+        self.credit = 0.0
+        self.chunk = (array("i"), array("Q"))
+        self.offset = 0
+        self.last_tick = None
+        self.paused_at = None
+        self.done = False
+        self._job = None
+
+    def start(self):
+        self.last_tick = perf_counter()
+        self.worker.start()
+        self._job = self.canvas.after(0, self._tick)
+
+    def pause(self):
+        if self.done or self.paused_at is not None:
+            return
+        self.worker.pause()
+        self._cancel()
+        self.paused_at = perf_counter()
+
+    def resume(self):
+        if self.done or self.paused_at is None:
+            return
+        self.last_tick = perf_counter()
+        self.timings["pause"] += self.last_tick - self.paused_at
+        self.paused_at = None
+        self.worker.resume()
+        self._job = self.canvas.after(0, self._tick)
+
+    def stop(self, wait=True):
+        if self.done:
+            return
+        self._cancel()
+        if self.paused_at is not None:
+            self.timings["pause"] += perf_counter() - self.paused_at
+            self.paused_at = None
+        self.worker.stop(wait)
+        self._finish(False)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.canvas.after_cancel(self._job)
+            self._job = None
+
+    def _finish(self, outcome):
+        self.done = True
+        self.timings["compute"] = self.worker.compute
+        self.on_done(outcome)
+
+    def _tick(self):
+        self._job = None
+        if self.done or self.paused_at is not None:
+            return
+        if self.stop_flag():
+            self.stop()
+            return
+        clock = perf_counter
+        timings = self.timings
+        began = clock()
+        timings["delay"] += began - self.last_tick
+
+        delay = self.delay_value.get() / 1000
+        if delay > 0:
+            self.credit += self.frame / delay
+            budget = int(self.credit)
+            self.credit -= budget
+            deadline = None
+        else:
+            budget = -1
+            deadline = began + self.frame * 0.75
+
+        paint, record, times = self.renderer.paint, self.record, self.times
+        finished = False
+        while budget:
+            codes, stamps = self.chunk
+            if self.offset >= len(codes):
+                try:
+                    item = self.worker.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                self.chunk, self.offset = item, 0
+                continue
+            first = self.offset
+            last = len(codes) if budget < 0 else min(len(codes), first + budget)
+            for code in codes[first:last]:
+                paint(code >> 2, EVENT_COLORS[code & 3])
+            if record is not None:
+                record.extend(codes[first:last])
+                if times is not None:
+                    times.extend(stamps[first:last])
+            self.offset = last
+            if budget > 0:
+                budget -= last - first
+            if deadline is not None and clock() >= deadline:
                 break
 
-            for dr, dc in dirs:
-                nr, nc = curr[0] + dr, curr[1] + dc
-                nb = (nr, nc)
-                if is_in_bounds(nr, nc, rows, cols) and grid[nr][nc] == 0 and nb not in visited_end:
-                    visited_end.add(nb)
-                    queue_end.append(nb)
-                    parents_end[nb] = curr
-
-                    if nb != end and nb != start:
-                        canvas.itemconfig(canvas_rectangles[nr][nc], fill=SEARCH_COLOR2)
-                        if stop_flag():
-                            return False
-                        delay_step(canvas, delay_value)
-                        _maybe_pause(pause_wait)
-                        if stop_flag():
-                            return False
-
-    if meeting_point:
-        path_length = reconstruct_bidirectional_path(
-            parents_start, parents_end, start, end, meeting_point,
-            canvas_rectangles, canvas, delay_value, stop_flag, pause_wait
-        )
-        return len(parents_start) + len(parents_end) + 1, path_length
-
-    else:
-        return False
-
-def dfs(grid, start, end, canvas_rectangles, canvas, stop_flag, delay_value, dirs, pause_wait=None):
-    rows, cols = len(grid), len(grid[0])
-    stack = [start]
-    visited = set([start])
-    parents = {}
-
-    while stack:
-        if stop_flag():
-            return False
-
-        _maybe_pause(pause_wait)
-        if stop_flag():
-            return False
-
-        current = stack.pop()
-        if current == end:
-            path_length = reconstruct_path(
-                parents, start, end, canvas_rectangles, canvas, delay_value, stop_flag, pause_wait
-            )
-            return len(visited), path_length
-
-        r, c = current
-
-        for dr, dc in dirs:
-            nr, nc = r + dr, c + dc
-            neighbor = (nr, nc)
-
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == 0 and neighbor not in visited:
-                parents[neighbor] = current
-
-                # early exit on discovery of the goal
-                if neighbor == end:
-                    path_length = reconstruct_path(
-                        parents, start, end, canvas_rectangles, canvas, delay_value, stop_flag, pause_wait
-                    )
-                    # +1 to count the end as visited (optional)
-                    return len(visited) + 1, path_length
-
-                visited.add(neighbor)
-                stack.append(neighbor)
-
-                if neighbor != start and neighbor != end:
-                    canvas.itemconfig(canvas_rectangles[nr][nc], fill=SEARCH_COLOR)
-                    delay_step(canvas, delay_value)
-                    if stop_flag():
-                        return False
-                    _maybe_pause(pause_wait)
-
-    return False
-
-def jps(grid, start, end, canvas_rectangles, canvas, stop_flag, delay_value, pause_wait=None):
-    rows, cols = len(grid), len(grid[0])
-    visited = set()
-    open_set = []
-    g_cost = {start: 0}
-    parents = {}
-
-    def jump(r, c, dr, dc):
-        while True:
-            r += dr
-            c += dc
-            if not is_in_bounds(r, c, rows, cols) or grid[r][c] != 0:
-                return None
-            if (r, c) == end:
-                return (r, c)
-
-            if dr != 0:
-                if (is_in_bounds(r, c + 1, rows, cols) and grid[r][c + 1] == 0 and
-                    is_in_bounds(r - dr, c + 1, rows, cols) and grid[r - dr][c + 1] == 1):
-                    return (r, c)
-                if (is_in_bounds(r, c - 1, rows, cols) and grid[r][c - 1] == 0 and
-                    is_in_bounds(r - dr, c - 1, rows, cols) and grid[r - dr][c - 1] == 1):
-                    return (r, c)
-
-            elif dc != 0:
-                if (is_in_bounds(r + 1, c, rows, cols) and grid[r + 1][c] == 0 and
-                    is_in_bounds(r + 1, c - dc, rows, cols) and grid[r + 1][c - dc] == 1):
-                    return (r, c)
-                if (is_in_bounds(r - 1, c, rows, cols) and grid[r - 1][c] == 0 and
-                    is_in_bounds(r - 1, c - dc, rows, cols) and grid[r - 1][c - dc] == 1):
-                    return (r, c)
-
-    def add_jump_neighbors(r, c):
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            jp = jump(r, c, dr, dc)
-            if jp and jp not in visited:
-                nr, nc = jp
-                new_cost = g_cost[(r, c)] + manhattan_distance((r, c), (nr, nc))
-                if jp not in g_cost or new_cost < g_cost[jp]:
-                    g_cost[jp] = new_cost
-                    f = new_cost + manhattan_distance(jp, end)
-                    heappush(open_set, (f, jp))
-                    parents[jp] = (r, c)
-
-    heappush(open_set, (manhattan_distance(start, end), start))
-    g_cost[start] = 0
-
-    while open_set:
-        if stop_flag():
-            return False
-
-        _maybe_pause(pause_wait)
-        if stop_flag():
-            return False
-
-        _, (r, c) = heappop(open_set)
-
-        if (r, c) in visited:
-            continue
-        visited.add((r, c))
-
-        if (r, c) != start and (r, c) != end:
-            canvas.itemconfig(canvas_rectangles[r][c], fill=SEARCH_COLOR)
-            delay_step(canvas, delay_value)
-            _maybe_pause(pause_wait)
-            if stop_flag():
-                return False
-
-        if (r, c) == end:
-            path_length = reconstruct_path(
-                parents, start, end, canvas_rectangles, canvas, delay_value, stop_flag, pause_wait
-            )
-            return len(visited), path_length
-
-        add_jump_neighbors(r, c)
-
-    return False
-
-def reconstruct_path(parents, start, end, canvas_rectangles, canvas, delay_value, stop_flag, pause_wait=None):
-    def line_between(a, b):
-        r1, c1 = a
-        r2, c2 = b
-        dr = (r2 - r1)
-        dc = (c2 - c1)
-        if dr:
-            dr //= abs(dr)
-        if dc:
-            dc //= abs(dc)
-        cells = []
-        r, c = r1 + dr, c1 + dc
-        while (r, c) != b:
-            cells.append((r, c))
-            r += dr
-            c += dc
-        return cells
-
-    curr = end
-    path_cells = []
-    while curr in parents:
-        prev = parents[curr]
-        if abs(curr[0] - prev[0]) + abs(curr[1] - prev[1]) > 1:
-            path_cells.extend(line_between(prev, curr))
-        path_cells.append(curr)
-        curr = prev
-
-    for cell in reversed(path_cells):
-        if stop_flag():
-            return False
-        _maybe_pause(pause_wait)
-
-        if cell != start and cell != end:
-            r, c = cell
-            rect = canvas_rectangles[r][c]
-            canvas.itemconfig(rect, fill=PATH_COLOR)
-            delay_step(canvas, delay_value)
-            _maybe_pause(pause_wait)
-
-    return len(path_cells)
-
-def reconstruct_bidirectional_path(
-    parents_start, parents_end, start, end, meeting_point,
-    canvas_rectangles, canvas, delay_value, stop_flag, pause_wait=None
-):
-    path = []
-    curr = meeting_point
-    while curr != start:
-        path.append(curr)
-        curr = parents_start[curr]
-    path.append(start)
-    path.reverse()
-    curr = parents_end.get(meeting_point)
-    while curr and curr != end:
-        path.append(curr)
-        curr = parents_end[curr]
-    if curr == end:
-        path.append(end)
-
-    path_length = 0
-    for cell in path:
-        if stop_flag():
-            return False
-        _maybe_pause(pause_wait)
-
-        if cell != start and cell != end:
-            r, c = cell
-            rect = canvas_rectangles[r][c]
-            canvas.itemconfig(rect, fill=PATH_COLOR)
-            path_length += 1
-            delay_step(canvas, delay_value)
-            _maybe_pause(pause_wait)
-
-    return path_length + 1
+        self.renderer.flush()
+        self.last_tick = clock()
+        timings["render"] += self.last_tick - began
+
+        if finished:
+            if self.worker.error is not None:
+                self._finish(False)
+                raise self.worker.error
+            result = self.worker.result
+            self._finish((result.visited, result.path_length) if result is not None else False)
+            return
+        wait = self.frame - (self.last_tick - began)
+        self._job = self.canvas.after(max(1, int(wait * 1000)), self._tick)
+
+
+class TracePlayer:
+    """Replays a maze.trace.Trace onto a cell surface without running any solver.
+
+    `position` is how many events are shown. seek() moves it either way:
+    forward applies the events in between, backward undoes them, each
+    cell going back to the color of its previous event or to
+    color_of(index) when it had none. Both cost the distance moved, not
+    the trace length, and only touch the pages of a memory-mapped trace
+    they read. play() advances along the trace's timestamps from after()
+    callbacks; `speed` scales solver time (1.0 replays the search at the
+    pace it ran, 0.01 a hundred times slower). on_move(position) is called
+    after every seek.
+    """
+
+    def __init__(self, trace, cells, canvas, color_of, on_move=None, fps=FRAME_RATE):
+        self.trace = trace
+        self.cells = cells
+        self.canvas = canvas
+        self.color_of = color_of
+        self.on_move = on_move
+        self.frame = 1 / fps
+        self.position = 0
+        self.playing = False
+        self._previous = None
+        self._clock = None
+        self._job = None
+
+    def previous_events(self):
+        """For every event, the position of the previous event on the same cell (-1 if none); built on first use."""
+        if self._previous is None:
+            last = {}
+            previous = array("i", bytes(4 * len(self.trace)))
+            for position, code in enumerate(self.trace.events):
+                index = code >> 2
+                previous[position] = last.get(index, -1)
+                last[index] = position
+            self._previous = previous
+        return self._previous
+
+    def seek(self, position):
+        position = max(0, min(int(position), len(self.trace)))
+        events, cells = self.trace.events, self.cells
+        if position > self.position:
+            for code in events[self.position:position]:
+                kind, index = unpack_event(code)
+                cells.set(index, EVENT_COLORS[kind])
+        elif position < self.position:
+            previous = self.previous_events()
+            # newest first, so each cell ends on its earliest undone event's predecessor
+            for undone in range(self.position - 1, position - 1, -1):
+                index = events[undone] >> 2
+                before = previous[undone]
+                cells.set(index, EVENT_COLORS[events[before] & 3] if before >= 0 else self.color_of(index))
+        self.position = position
+        cells.flush()
+        self.canvas.update_idletasks()
+        if self.on_move:
+            self.on_move(position)
+
+    def play(self, speed=1.0):
+        """Play from the current position (from the start if at the end)."""
+        self.pause()
+        if self.position >= len(self.trace):
+            self.seek(0)
+        self.playing = True
+        self._clock = (perf_counter(), self.trace.time(self.position - 1) if self.position else 0.0, speed)
+        self._job = self.canvas.after(0, self._tick)
+
+    def pause(self):
+        self.playing = False
+        if self._job is not None:
+            self.canvas.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        if not self.playing:
+            return
+        began, trace_time, speed = self._clock
+        self.seek(self.trace.position_at(trace_time + (perf_counter() - began) * speed))
+        if self.position >= len(self.trace):
+            self.playing = False
+            return
+        self._job = self.canvas.after(int(self.frame * 1000), self._tick)
+
+
+def paint_events(events, cells, canvas):
+    """Paint a recorded event log onto a cell surface at once, without delays."""
+    for code in events:
+        kind, index = unpack_event(code)
+        cells.set(index, EVENT_COLORS[kind])
+    cells.flush()
+    canvas.update()
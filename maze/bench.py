@@ -0,0 +1,194 @@
+"""Headless benchmarks: seeded generated mazes, every solver, JSON results.
+
+    python -m maze.bench --sizes 81x77 513x513 2049x2049 --out bench.json
+
+Each maze is carved by generator.carve_recursive_backtracker with a seeded
+random.Random and solved corner to corner. For every algorithm the suite
+records the best wall time over --repeat runs (plus the first, cold run,
+which pays for derived structures such as the JPS+ tables), nodes expanded
+per second, the peak traced memory of one extra run, and the path length
+against the BFS optimum. LPA* and HPA* keep their state between repeats,
+so their best time is that of a warm query. With --open-set, every solver
+that has an open set runs once per listed kind (see maze.queues).
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+from maze.components import reachable
+from maze.generator import place_endpoints, carve_recursive_backtracker
+from maze.grid import Grid
+from maze.queues import OPEN_SETS
+from maze.solvers import SOLVERS, open_set_options, solve
+from maze.utils import movement
+
+DEFAULT_SIZES = ((81, 77), (257, 257), (1025, 1025), (2049, 2049))
+
+# shortest-path reference for the optimality ratio
+REFERENCE = "BFS"
+
+
+def make_maze(rows, cols, seed):
+    """Seeded maze with endpoints in opposite corners. Returns (grid, start, end, carve seconds)."""
+    grid = Grid(rows, cols)
+    rng = random.Random(seed)
+    began = perf_counter()
+    carve_recursive_backtracker(grid, rng=rng)
+    seconds = perf_counter() - began
+    # odd cells are corridor cells in a carved maze
+    start = (min(1, rows - 1), min(1, cols - 1))
+    end = (max(rows - 1 - rows % 2, 0), max(cols - 1 - cols % 2, 0))
+    start, end = place_endpoints(grid, start, end, rng=rng)
+    return grid, start, end, seconds
+
+
+def measure(algorithm, grid, start, end, move_mode, repeat=3, memory=True, open_set=None):
+    """Time one algorithm on one maze; returns a dict of measurements."""
+    dirs, heuristic = movement(move_mode)
+    options = open_set_options(algorithm, open_set)
+    runs = []
+    for _ in range(max(repeat, 1)):
+        began = perf_counter()
+        result = solve(algorithm, grid, start, end, dirs, heuristic, **options)
+        runs.append((perf_counter() - began, result))
+    best, result = min(runs, key=lambda run: run[0])
+    visited = result.visited if result else 0
+    row = {
+        "algorithm": algorithm,
+        "open_set": options.get("open_set"),
+        "seconds": best,
+        "cold_seconds": runs[0][0],
+        "found": result is not None,
+        "visited": visited,
+        "nodes_per_second": visited / best if best > 0 else None,
+        "path_length": result.path_length if result else None,
+        "peak_bytes": None,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            solve(algorithm, grid, start, end, dirs, heuristic, **options)
+            row["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return row
+
+
+def _revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_suite(sizes=DEFAULT_SIZES, algorithms=None, moves=("4",), seed=0, repeat=3, memory=True, log=None,
+              open_sets=None):
+    """Benchmark every (size, move mode) pair; returns the JSON-ready report.
+
+    `open_sets` lists open-set kinds to run each solver that has one with;
+    None runs every solver on its default.
+    """
+    algorithms = list(algorithms or SOLVERS)
+    variants = []
+    for algorithm in algorithms:
+        kinds = [kind for kind in open_sets or () if open_set_options(algorithm, kind)]
+        variants += [(algorithm, kind) for kind in kinds or [None]]
+    mazes = []
+    for rows, cols in sizes:
+        grid, start, end, carve_seconds = make_maze(rows, cols, seed)
+        for move_mode in moves:
+            dirs, heuristic = movement(move_mode)
+            # the component index is shared by every solve(); build it outside the timings
+            reachable(grid, start, end, dirs)
+            optimum = solve(REFERENCE, grid, start, end, dirs, heuristic)
+            optimal_length = optimum.path_length if optimum else None
+            runs = []
+            for algorithm, open_set in variants:
+                row = measure(algorithm, grid, start, end, move_mode, repeat, memory, open_set)
+                if optimal_length and row["path_length"] is not None:
+                    row["optimality"] = row["path_length"] / optimal_length
+                else:
+                    row["optimality"] = None
+                runs.append(row)
+                if log:
+                    log(rows, cols, move_mode, row)
+            mazes.append({
+                "rows": rows,
+                "cols": cols,
+                "moves": move_mode,
+                "seed": seed,
+                "start": list(start),
+                "end": list(end),
+                "open_cells": grid.cells.count(0),
+                "generate_seconds": carve_seconds,
+                "optimal_length": optimal_length,
+                "runs": runs,
+            })
+    return {
+        "meta": {
+            "revision": _revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": repeat,
+            "open_sets": list(open_sets) if open_sets else None,
+        },
+        "mazes": mazes,
+    }
+
+
+def _print_row(rows, cols, move_mode, row):
+    rate = row["nodes_per_second"]
+    peak = row["peak_bytes"]
+    ratio = row["optimality"]
+    name = row["algorithm"] + (f" [{row['open_set']}]" if row["open_set"] else "")
+    print(f"{rows}x{cols} {move_mode}-dir {name:<20} "
+          f"{row['seconds'] * 1000:10.2f} ms  "
+          f"{rate / 1e6 if rate else 0:7.3f} Mnodes/s  "
+          f"{peak / 2 ** 20 if peak is not None else 0:8.2f} MiB  "
+          f"{'x%.3f' % ratio if ratio is not None else '-'}", flush=True)
+
+
+def _size(text):
+    rows, _, cols = text.lower().partition("x")
+    try:
+        return int(rows), int(cols or rows)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ROWSxCOLS, got {text!r}") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m maze.bench", description="Benchmark the maze solvers headlessly.")
+    parser.add_argument("--sizes", nargs="+", type=_size, default=list(DEFAULT_SIZES), metavar="ROWSxCOLS")
+    parser.add_argument("--algos", nargs="+", choices=list(SOLVERS), default=None, metavar="ALGO",
+                        help="algorithms to run (default: all of " + ", ".join(SOLVERS) + ")")
+    parser.add_argument("--moves", nargs="+", choices=["4", "8"], default=["4"])
+    parser.add_argument("--open-set", nargs="+", choices=list(OPEN_SETS), default=None, metavar="KIND",
+                        help="run solvers that have an open set once per kind: " + ", ".join(OPEN_SETS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--out", type=Path, default=None, help="write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.algos, args.moves, args.seed, args.repeat,
+                       memory=not args.no_memory, log=_print_row if args.out else None, open_sets=args.open_set)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+from maze.utils import DIRS_4
+from maze.events import PUSH, PATH, SearchResult
+
+_OPEN_TO_BIT = bytes([ord("1")]) + bytes([ord("0")]) * 255
+
+# levels between (visited, front) checkpoints kept for path recovery
+_STRIDE = 64
+
+
+class BitGrid:
+    """The open cells of a maze packed into one Python int.
+
+    Cell (r, c) is bit r * width + c, with width = cols + 1: the extra zero
+    column guards row ends, so horizontal shifts never wrap into the next
+    row. A BFS level is then a handful of shift/OR/AND operations on whole
+    bitsets instead of a Python loop over cells. Needs no third-party
+    packages.
+    """
+
+    def __init__(self, grid, dirs=DIRS_4):
+        rows, cols = len(grid), len(grid[0])
+        width = cols + 1
+        self.rows, self.cols, self.width = rows, cols, width
+        self.dirs = tuple(dirs)
+        self.shifts = tuple(dr * width + dc for dr, dc in dirs)
+
+        # most significant bit first: last row, guard column, then columns right to left
+        digits = bytearray()
+        for r in range(rows - 1, -1, -1):
+            digits.append(ord("0"))
+            digits += bytes(grid[r])[::-1].translate(_OPEN_TO_BIT)
+        self.open = int(digits, 2) if digits else 0
+
+    def bit(self, cell):
+        return cell[0] * self.width + cell[1]
+
+    def cell(self, bit):
+        return divmod(bit, self.width)
+
+    def expand(self, front):
+        """All cells one move away from `front` (not masked)."""
+        reached = 0
+        for shift in self.shifts:
+            reached |= front << shift if shift >= 0 else front >> -shift
+        return reached
+
+    def levels(self, visited, front, goal=0):
+        """Yield (visited, front) after each BFS level, stopping once a goal bit is visited."""
+        open_cells = self.open
+        while front and not visited & goal:
+            front = self.expand(front) & open_cells & ~visited
+            if not front:
+                return
+            visited |= front
+            yield visited, front
+
+    def cells_of(self, bits):
+        """Flat cell indexes (r * cols + c) of the set bits, in ascending order."""
+        digits = bin(bits)[:1:-1]
+        width, cols = self.width, self.cols
+        found = []
+        bit = digits.find("1")
+        while bit >= 0:
+            r, c = divmod(bit, width)
+            found.append(r * cols + c)
+            bit = digits.find("1", bit + 1)
+        return found
+
+
+def reachable(grid, start, dirs=DIRS_4):
+    """Bitset of every cell reachable from start (see BitGrid for the bit layout)."""
+    bits = BitGrid(grid, dirs)
+    visited = front = 1 << bits.bit(start)
+    for visited, front in bits.levels(visited, front):
+        pass
+    return visited
+
+
+def bitset_distance(grid, start, end, dirs=DIRS_4):
+    """Shortest-path length from start to end, or None if end is unreachable."""
+    bits = BitGrid(grid, dirs)
+    goal = 1 << bits.bit(end)
+    visited = front = 1 << bits.bit(start)
+    level = 0
+    for level, (visited, front) in enumerate(bits.levels(visited, front, goal), 1):
+        pass
+    return level if visited & goal else None
+
+
+def _search(bits, start, end):
+    """Forward pass that keeps a (visited, front) checkpoint every _STRIDE levels.
+
+    Returns (visited, distance, checkpoints); distance is None when end is unreachable.
+    """
+    goal = 1 << bits.bit(end)
+    visited = front = 1 << bits.bit(start)
+    checkpoints = [(visited, front)]
+    level = 0
+    for level, (visited, front) in enumerate(bits.levels(visited, front, goal), 1):
+        if level % _STRIDE == 0:
+            checkpoints.append((visited, front))
+    return visited, (level if visited & goal else None), checkpoints
+
+
+def _trace(bits, end, distance, checkpoints):
+    """Walk back from end one level at a time; returns (r, c) cells from start to end.
+
+    Only the frontiers of one stride are held at once: each segment is
+    recomputed from its checkpoint, so memory grows with levels / _STRIDE
+    instead of holding one full bitset per level.
+    """
+    i = bits.bit(end)
+    path = [end]
+    level = distance
+    while level > 0:
+        base = (level - 1) // _STRIDE * _STRIDE
+        visited, front = checkpoints[base // _STRIDE]
+        fronts = [front]
+        for _, front in bits.levels(visited, front):
+            if len(fronts) == level - base:
+                break
+            fronts.append(front)
+        for front in reversed(fronts):
+            for shift in bits.shifts:
+                j = i - shift
+                if j >= 0 and (front >> j) & 1:
+                    i = j
+                    break
+            path.append(bits.cell(i))
+        level = base
+    path.reverse()
+    return path
+
+
+def bitset_bfs(grid, start, end, dirs=DIRS_4, heuristic=None):
+    """Headless bit-parallel BFS; use bitset_distance() when only the length matters."""
+    bits = BitGrid(grid, dirs)
+    visited, distance, checkpoints = _search(bits, start, end)
+    if distance is None:
+        return None
+    return SearchResult(visited.bit_count(), _trace(bits, end, distance, checkpoints))
+
+
+def bitset_steps(grid, start, end, dirs=DIRS_4, heuristic=None):
+    """Step-event version of bitset_bfs: one PUSH per cell, level by level."""
+    bits = BitGrid(grid, dirs)
+    goal = 1 << bits.bit(end)
+    visited = front = 1 << bits.bit(start)
+    checkpoints = [(visited, front)]
+    level = 0
+    for level, (visited, front) in enumerate(bits.levels(visited, front, goal), 1):
+        if level % _STRIDE == 0:
+            checkpoints.append((visited, front))
+        for index in bits.cells_of(front):
+            yield PUSH, index
+    if not visited & goal:
+        return None
+
+    path = _trace(bits, end, level, checkpoints)
+    cols = bits.cols
+    for r, c in path:
+        yield PATH, r * cols + c
+    return SearchResult(visited.bit_count(), path)
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from hashlib import blake2b
+
+
+def grid_digest(grid):
+    """Content hash of a grid, memoized per Grid.version so repeat lookups are free."""
+    derived = getattr(grid, "derived", None)
+    if derived is not None:
+        cached = derived.get("digest")
+        if cached is not None and cached[0] == grid.version:
+            return cached[1]
+    h = blake2b(b"%d,%d;" % (len(grid), len(grid[0])), digest_size=16)
+    if hasattr(grid, "cells"):
+        h.update(grid.cells)
+        h.update(grid.costs)
+    else:
+        h.update(bytes(v for row in grid for v in row))
+    digest = h.digest()
+    if derived is not None:
+        derived["digest"] = (grid.version, digest)
+    return digest
+
+
+class SolveCache:
+    """Bounded LRU cache of solve results keyed by maze content, endpoints, move mode, algorithm and run options.
+
+    Keys hash the grid cells, so any edit (toggle_wall, draw_wall, a new
+    maze, reset_all) makes old entries unreachable instead of stale; they
+    then age out. Memory is bounded both by entry count and by total weight
+    (path cells plus any recorded events).
+    """
+
+    def __init__(self, maxsize=128, max_weight=2_000_000):
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(grid, start, end, move_mode, algorithm, **options):
+        """Options that change what a run produces (open_set, instrument, ...) are part of the key."""
+        return (grid_digest(grid), start, end, str(move_mode), algorithm, tuple(sorted(options.items())))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, weight=1):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.weight -= old[0]
+        if weight > self.max_weight:
+            return
+        self._entries[key] = (weight, value)
+        self.weight += weight
+        while len(self._entries) > self.maxsize or self.weight > self.max_weight:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.weight -= evicted
+
+    def clear(self):
+        self._entries.clear()
+        self.weight = 0
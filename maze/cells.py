@@ -0,0 +1,202 @@
+"""Cell surfaces: how the GUI puts one color per maze cell on the canvas.
+
+Both surfaces take flat cell indexes (r * cols + c) and share one
+interface: set() / get() single cells, fill() / load() in bulk, restore()
+to put back the cells changed since the last bulk repaint, and flush() to
+bring the screen up to date. Each keeps the color of every cell in
+memory, so reading a color never asks Tk. tkinter is only imported when
+a bitmap is built, so the headless CLI can read RENDERERS and BITMAP_CELLS.
+"""
+from collections import Counter
+
+RENDERERS = ("rectangles", "bitmap")
+
+# grids with more cells than this are drawn as a bitmap unless asked otherwise
+BITMAP_CELLS = 40_000
+
+# canvas tag carried by every cell rectangle
+CELL_TAG = "cell"
+
+
+class CellSurface:
+    """Touched-cell tracking shared by the surfaces.
+
+    `touched` holds every index set() since the last fill(), load() or
+    restore(), so a search can be wiped by repainting just the cells it
+    painted instead of the whole grid.
+    """
+
+    def set(self, index, color):
+        self.touched.add(index)
+        self._set(index, color)
+
+    def restore(self, color_of, skip=()):
+        """Repaint the touched cells with color_of(index) and flush; cells in `skip` stay touched."""
+        touched, self.touched = self.touched, set()
+        for index in touched:
+            if index in skip:
+                self.touched.add(index)
+            else:
+                self._set(index, color_of(index))
+        self.flush()
+        return len(touched)
+
+
+class RectangleCells(CellSurface):
+    """One canvas rectangle per cell.
+
+    `colors` mirrors every rectangle's fill, so a cell that already has
+    the color costs no Tk call, and bulk repaints recolor all rectangles
+    with one itemconfig() on CELL_TAG before fixing up the rest.
+    """
+
+    def __init__(self, canvas, rows, cols, cell_size, background):
+        self.canvas = canvas
+        self.rows, self.cols = rows, cols
+        self.size = rows * cols
+        self.colors = [background] * self.size
+        self.touched = set()
+        self.rectangles = [[None for _ in range(cols)] for _ in range(rows)]
+        for row in range(rows):
+            for col in range(cols):
+                x1 = col * cell_size
+                y1 = row * cell_size
+                self.rectangles[row][col] = canvas.create_rectangle(
+                    x1, y1, x1 + cell_size, y1 + cell_size, fill=background, outline="", tags=CELL_TAG)
+
+    def item(self, index):
+        r, c = divmod(index, self.cols)
+        return self.rectangles[r][c]
+
+    def _set(self, index, color):
+        if self.colors[index] != color:
+            self.colors[index] = color
+            r, c = divmod(index, self.cols)
+            self.canvas.itemconfig(self.rectangles[r][c], fill=color)
+
+    def get(self, index):
+        return self.colors[index]
+
+    def fill(self, color):
+        self.canvas.itemconfig(CELL_TAG, fill=color)
+        self.colors = [color] * self.size
+        self.touched.clear()
+
+    def load(self, colors):
+        """Color every cell from a sequence of one color per index.
+
+        Only cells whose color changes are configured, unless filling the
+        grid with the most common color first takes fewer calls.
+        """
+        colors = list(colors)
+        common, count = Counter(colors).most_common(1)[0]
+        changed = sum(1 for old, new in zip(self.colors, colors) if old != new)
+        if self.size - count + 1 < changed:
+            self.fill(common)
+        for index, color in enumerate(colors):
+            self._set(index, color)
+        self.touched.clear()
+
+    def flush(self):
+        pass
+
+
+class BitmapCells(CellSurface):
+    """The whole maze as one PhotoImage, cell_size pixels per cell.
+
+    Colors live in a bytearray of palette indexes, one per cell. Changes
+    mark a column span of their row dirty (setting a cell to the color it
+    has marks nothing), and flush() writes each dirty
+    span with a single put() of PPM data; bulk changes redraw the image in
+    one put(). There is one canvas item however large the grid is.
+    """
+
+    def __init__(self, canvas, rows, cols, cell_size, background):
+        self.canvas = canvas
+        self.rows, self.cols = rows, cols
+        self.size = rows * cols
+        self.cell_size = cell_size
+        self.palette = []
+        self.color_ids = {}
+        self.pixels = []  # per palette index: its RGB bytes repeated cell_size times
+        self.colors = bytearray(self.size)
+        self.touched = set()
+        self.dirty = {}  # row -> [first col, last col]
+        import tkinter as tk
+
+        self.image = tk.PhotoImage(width=cols * cell_size, height=rows * cell_size)
+        self.item = canvas.create_image(0, 0, image=self.image, anchor="nw")
+        self.fill(background)
+
+    def color_id(self, color):
+        ident = self.color_ids.get(color)
+        if ident is None:
+            if len(self.palette) == 256:
+                raise ValueError("a bitmap grid holds at most 256 colors")
+            ident = self.color_ids[color] = len(self.palette)
+            self.palette.append(color)
+            rgb = bytes(value >> 8 for value in self.canvas.winfo_rgb(color))
+            self.pixels.append(rgb * self.cell_size)
+        return ident
+
+    def _set(self, index, color):
+        ident = self.color_id(color)
+        if self.colors[index] == ident:
+            return
+        self.colors[index] = ident
+        r, c = divmod(index, self.cols)
+        span = self.dirty.get(r)
+        if span is None:
+            self.dirty[r] = [c, c]
+        elif c < span[0]:
+            span[0] = c
+        elif c > span[1]:
+            span[1] = c
+
+    def get(self, index):
+        return self.palette[self.colors[index]]
+
+    def fill(self, color):
+        self.colors[:] = bytes([self.color_id(color)]) * self.size
+        self.touched.clear()
+        self.redraw()
+
+    def load(self, colors):
+        """Color every cell from a sequence of one color per index."""
+        color_id = self.color_id
+        self.colors[:] = bytes(color_id(color) for color in colors)
+        self.touched.clear()
+        self.redraw()
+
+    def _ppm(self, first_row, last_row, first_col, last_col):
+        pixels, colors, cols = self.pixels, self.colors, self.cols
+        size = self.cell_size
+        width = (last_col - first_col + 1) * size
+        rows = []
+        for r in range(first_row, last_row + 1):
+            base = r * cols
+            line = b"".join(map(pixels.__getitem__, colors[base + first_col:base + last_col + 1]))
+            rows.append(line * size)
+        header = f"P6 {width} {len(rows) * size} 255 ".encode()
+        return header + b"".join(rows)
+
+    def redraw(self):
+        self.dirty.clear()
+        self.image.put(self._ppm(0, self.rows - 1, 0, self.cols - 1), to=(0, 0))
+
+    def flush(self):
+        size = self.cell_size
+        for r, (first, last) in self.dirty.items():
+            self.image.put(self._ppm(r, r, first, last), to=(first * size, r * size))
+        self.dirty.clear()
+
+
+def make_cells(canvas, rows, cols, cell_size, background, renderer=None):
+    """Build the surface named by `renderer`; None picks by grid size (see BITMAP_CELLS)."""
+    if renderer is None:
+        renderer = "bitmap" if rows * cols > BITMAP_CELLS else "rectangles"
+    if renderer == "bitmap":
+        return BitmapCells(canvas, rows, cols, cell_size, background)
+    if renderer == "rectangles":
+        return RectangleCells(canvas, rows, cols, cell_size, background)
+    raise ValueError(f"Unknown renderer: {renderer}")
@@ -0,0 +1,195 @@
+"""Headless command line: solve a maze file or a generated maze and print JSON.
+
+    python main.py solve --algo "A*" --moves 8 --maze maze.txt
+    python main.py solve --algo BFS --size 201x201 --seed 7 --start 1,1 --end 199,199
+    printf '1,1 9,9\\n1,1 5,7\\n' | python main.py solve --maze maze.txt --batch   # exits 1 if any line failed
+    python main.py solve --algo BFS --size 1001x1001 --seed 3 --trace bfs.mztrace
+    python main.py solve --algo A* --size 1001x1001 --open-set bucket
+    python main.py gui --size 1001x1001
+
+Maze files are text, one row per line: '#' or '1' is a wall, any other
+character is open, and 'S' / 'E' mark the start and end. Only the `gui`
+command imports the GUI toolkits.
+"""
+import argparse
+import json
+import random
+import sys
+from time import perf_counter
+
+from maze.cells import BITMAP_CELLS, RENDERERS
+from maze.generator import generate_maze
+from maze.grid import Grid, OPEN, WALL
+from maze.instrument import instrumented_solve
+from maze.queues import OPEN_SETS
+from maze.solvers import SOLVERS, open_set_options, solve
+from maze.trace import record_trace, save_trace
+from maze.utils import movement
+from maze.weighted import path_cost
+
+
+def parse_maze(text):
+    """Parse maze text into (grid, start, end); start/end are None when unmarked."""
+    lines = [line.rstrip("\r\n") for line in text.splitlines()]
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        raise ValueError("maze file is empty")
+    cols = max(len(line) for line in lines)
+    grid = Grid(len(lines), cols)
+    cells = grid.cells
+    start = end = None
+    for r, line in enumerate(lines):
+        for c, ch in enumerate(line.ljust(cols, ".")):
+            cells[r * cols + c] = WALL if ch in "#1" else OPEN
+            if ch == "S":
+                start = (r, c)
+            elif ch == "E":
+                end = (r, c)
+    grid.touch()
+    return grid, start, end
+
+
+def _cell(text):
+    try:
+        r, c = (int(part) for part in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected r,c, got {text!r}") from None
+    return r, c
+
+
+def _size(text):
+    rows, _, cols = text.lower().partition("x")
+    try:
+        return int(rows), int(cols or rows)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ROWSxCOLS, got {text!r}") from None
+
+
+def solve_one(grid, start, end, algorithm, move_mode, with_path=False, with_counters=False, open_set=None):
+    """Solve one query and return its JSON-ready stats."""
+    for name, (r, c) in (("start", start), ("end", end)):
+        if not grid.in_bounds(r, c):
+            raise ValueError(f"{name} {r},{c} is outside the {grid.rows}x{grid.cols} maze")
+    dirs, heuristic = movement(move_mode)
+    options = open_set_options(algorithm, open_set)
+    began = perf_counter()
+    if with_counters:
+        result, counters = instrumented_solve(algorithm, grid, start, end, dirs, heuristic, **options)
+    else:
+        result = solve(algorithm, grid, start, end, dirs, heuristic, **options)
+    seconds = perf_counter() - began
+    stats = {
+        "algorithm": algorithm,
+        "moves": move_mode,
+        "open_set": options.get("open_set"),
+        "rows": grid.rows,
+        "cols": grid.cols,
+        "start": list(start),
+        "end": list(end),
+        "found": result is not None,
+        "visited": result.visited if result else 0,
+        "path_length": result.path_length if result else None,
+        "path_cost": path_cost(grid, result.path) if result else None,
+        "seconds": seconds,
+        "stats": result.stats if result else {},
+    }
+    if with_counters:
+        stats["counters"] = counters
+    if with_path:
+        stats["path"] = [list(cell) for cell in result.path] if result else []
+    return stats
+
+
+def cmd_solve(args):
+    if args.open_set and not open_set_options(args.algo, args.open_set):
+        raise ValueError(f"{args.algo} has no open set to choose")
+    if args.maze:
+        with open(args.maze, encoding="utf-8") as f:
+            grid, start, end = parse_maze(f.read())
+        start = args.start or start
+        end = args.end or end
+        if not args.batch and (start is None or end is None):
+            raise ValueError("the maze has no S/E marks; pass --start and --end")
+    else:
+        grid = Grid(*args.size)
+        start, end = generate_maze(grid, args.start, args.end, rng=random.Random(args.seed))
+
+    if not args.batch:
+        stats = solve_one(grid, start, end, args.algo, args.moves, args.path, args.counters, args.open_set)
+        if args.trace:
+            # a separate, untimed run records the events the GUI would paint
+            dirs, heuristic = movement(args.moves)
+            _, trace = record_trace(args.algo, grid, start, end, dirs, heuristic,
+                                    **open_set_options(args.algo, args.open_set))
+            stats["trace"] = save_trace(args.trace, trace)
+            stats["trace_events"] = len(trace)
+        print(json.dumps(stats))
+        return 0
+    if args.trace:
+        raise ValueError("--trace records a single query; drop --batch")
+
+    # one "r,c r,c" query per input line, one JSON line per answer; derived
+    # structures (graph, component index, JPS+ tables) are shared between queries.
+    # A bad line gets an {"line", "error"} answer and the batch goes on.
+    failed = 0
+    for number, line in enumerate(sys.stdin, 1):
+        if not line.strip():
+            continue
+        try:
+            fields = line.split()
+            if len(fields) != 2:
+                raise ValueError(f"expected 'r,c r,c', got {line.strip()!r}")
+            start, end = (_cell(field) for field in fields)
+            stats = solve_one(grid, start, end, args.algo, args.moves, args.path, args.counters, args.open_set)
+        except (ValueError, argparse.ArgumentTypeError) as e:
+            failed += 1
+            stats = {"line": number, "error": str(e)}
+        sys.stdout.write(json.dumps(stats) + "\n")
+    return 1 if failed else 0
+
+
+def cmd_gui(args):
+    from maze.gui import show_gui
+    rows, cols = args.size
+    gui, root = show_gui(rows, cols, cell_size=args.cell, renderer=args.renderer)
+    root.mainloop()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py", description="Maze solver visualizer; no command opens the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve_parser = commands.add_parser("solve", help="solve headlessly and print JSON stats")
+    solve_parser.add_argument("--algo", default="A*", choices=list(SOLVERS), metavar="ALGO",
+                              help="one of " + ", ".join(SOLVERS) + " (default: A*)")
+    solve_parser.add_argument("--moves", default="4", choices=["4", "8"])
+    solve_parser.add_argument("--open-set", choices=list(OPEN_SETS), default=None,
+                              help="open set for A*, JPS, JPS+ and Dijkstra (default: the solver's own; see maze.queues)")
+    solve_parser.add_argument("--maze", help="maze text file; a maze is generated when omitted")
+    solve_parser.add_argument("--size", type=_size, default=(81, 77), metavar="ROWSxCOLS",
+                              help="size of the generated maze (default: 81x77)")
+    solve_parser.add_argument("--seed", type=int, default=None, help="seed for the generated maze")
+    solve_parser.add_argument("--start", type=_cell, metavar="R,C")
+    solve_parser.add_argument("--end", type=_cell, metavar="R,C")
+    solve_parser.add_argument("--batch", action="store_true", help="read 'r,c r,c' queries from stdin")
+    solve_parser.add_argument("--path", action="store_true", help="include the path cells in the output")
+    solve_parser.add_argument("--counters", action="store_true",
+                              help="add search counters and peak traced memory (slower; see maze.instrument)")
+    solve_parser.add_argument("--trace", metavar="FILE",
+                              help="also save the run's step events as a trace the GUI can replay (see maze.trace)")
+    solve_parser.set_defaults(handler=cmd_solve)
+
+    gui_parser = commands.add_parser("gui", help="open the visualizer on a grid of any size")
+    gui_parser.add_argument("--size", type=_size, default=(81, 77), metavar="ROWSxCOLS", help="grid size (default: 81x77)")
+    gui_parser.add_argument("--cell", type=int, default=None, metavar="PIXELS",
+                            help="cell size in pixels (default: fit the grid in the window)")
+    gui_parser.add_argument("--renderer", choices=RENDERERS, default=None,
+                            help=f"cell drawing; default: bitmap above {BITMAP_CELLS} cells, rectangles below")
+    gui_parser.set_defaults(handler=cmd_gui)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
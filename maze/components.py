@@ -0,0 +1,169 @@
+from array import array
+from collections import deque
+
+from maze.graph import derived_for, pad_cells, padded_node
+from maze.utils import DIRS_4
+
+
+class ComponentIndex:
+    """Connected regions of open cells, so reachability is one label compare.
+
+    labels[i] is the region of open node i and -1 for walls and padding
+    (nodes use the wall-padded layout of maze.graph). After wall edits,
+    update_cells() patches the labels locally: an opened cell joins its
+    neighbors' regions, relabeling the smaller ones; a new wall floods
+    from its neighbors in lockstep and stops as soon as one piece is left
+    unexplored, so only the pieces that broke off are relabeled.
+    """
+
+    def __init__(self, grid, dirs=DIRS_4):
+        rows, cols = len(grid), len(grid[0])
+        width = cols + 2
+        self.grid = grid
+        self.rows, self.cols, self.width = rows, cols, width
+        self.dirs = tuple(dirs)
+        self.deltas = tuple(dr * width + dc for dr, dc in dirs)
+        self.labels = array("i", [-1]) * ((rows + 2) * width)
+        self.sizes = {}
+        self.next_label = 0
+        self.version = getattr(grid, "version", None)
+
+        passable = pad_cells(grid)
+        labels = self.labels
+        for i in range(len(passable)):
+            if passable[i] and labels[i] < 0:
+                label = self._new_label()
+                labels[i] = label
+                self.sizes[label] = self._flood(i, -1, label, passable)
+
+    def _new_label(self):
+        label = self.next_label
+        self.next_label += 1
+        return label
+
+    def _flood(self, source, old, new, passable=None):
+        """Relabel the nodes reachable from source (already labeled) from old to new; returns their count."""
+        labels, deltas = self.labels, self.deltas
+        queue = deque([source])
+        count = 1
+        while queue:
+            i = queue.popleft()
+            for d in deltas:
+                j = i + d
+                if labels[j] == old and (passable is None or passable[j]):
+                    labels[j] = new
+                    queue.append(j)
+                    count += 1
+        return count
+
+    def node(self, r, c):
+        return (r + 1) * self.width + c + 1
+
+    def label(self, r, c):
+        return self.labels[(r + 1) * self.width + c + 1]
+
+    def connected(self, a, b):
+        """True when cells a and b are both open and in the same region."""
+        label = self.label(*a)
+        return label >= 0 and label == self.label(*b)
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def update_cells(self, indexes):
+        """Re-read edited cells (flat r * cols + c indexes) from the grid and patch the labels."""
+        cols, grid, labels = self.cols, self.grid, self.labels
+        for index in indexes:
+            r, c = divmod(index, cols)
+            u = padded_node(index, cols)
+            is_open = grid[r][c] == 0
+            if is_open and labels[u] < 0:
+                self._open(u)
+            elif not is_open and labels[u] >= 0:
+                self._close(u)
+        self.version = getattr(grid, "version", None)
+
+    def _open(self, u):
+        labels, sizes = self.labels, self.sizes
+        around = {}
+        for d in self.deltas:
+            label = labels[u + d]
+            if label >= 0 and label not in around:
+                around[label] = u + d
+        if not around:
+            label = self._new_label()
+            labels[u] = label
+            sizes[label] = 1
+            return
+        keep = max(around, key=sizes.__getitem__)
+        labels[u] = keep
+        sizes[keep] += 1
+        for label, seed in around.items():
+            if label != keep:
+                labels[seed] = keep
+                sizes[keep] += self._flood(seed, label, keep)
+                del sizes[label]
+
+    def _close(self, u):
+        labels, sizes, deltas = self.labels, self.sizes, self.deltas
+        label = labels[u]
+        labels[u] = -1
+        sizes[label] -= 1
+        seeds = []
+        for d in deltas:
+            if labels[u + d] == label and u + d not in seeds:
+                seeds.append(u + d)
+        if not sizes[label]:
+            del sizes[label]
+        if len(seeds) < 2:
+            return
+
+        # one flood per seed, a step each in turn; floods that meet are the same piece
+        queues = [deque([s]) for s in seeds]
+        owner = {s: f for f, s in enumerate(seeds)}
+        group = list(range(len(seeds)))
+
+        def find(f):
+            while group[f] != f:
+                group[f] = group[group[f]]
+                f = group[f]
+            return f
+
+        while True:
+            active = {find(f) for f, queue in enumerate(queues) if queue}
+            if len(active) <= 1:
+                break
+            for f, queue in enumerate(queues):
+                if not queue:
+                    continue
+                i = queue.popleft()
+                for d in deltas:
+                    j = i + d
+                    if labels[j] == label:
+                        other = owner.get(j)
+                        if other is None:
+                            owner[j] = f
+                            queue.append(j)
+                        else:
+                            group[find(other)] = find(f)
+
+        # every piece whose flood ran dry broke off; the one still open keeps the label
+        split = {g: self._new_label() for g in {find(f) for f in range(len(seeds))} - active}
+        for i, f in owner.items():
+            new = split.get(find(f))
+            if new is not None:
+                labels[i] = new
+                sizes[new] = sizes.get(new, 0) + 1
+                sizes[label] -= 1
+        if not sizes[label]:
+            del sizes[label]
+
+
+def components_for(grid, dirs=DIRS_4):
+    """Return the grid's ComponentIndex for this move mode, patched with any edits since it was built."""
+    return derived_for(grid, ("components", tuple(dirs)), lambda: ComponentIndex(grid, dirs))
+
+
+def reachable(grid, start, end, dirs=DIRS_4):
+    """O(1) after the first call per maze: can any solver connect start and end?"""
+    return components_for(grid, dirs).connected(start, end)
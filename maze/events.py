@@ -0,0 +1,55 @@
+from array import array
+from dataclasses import dataclass, field
+from time import perf_counter
+
+# Step event kinds. Every solver is a generator yielding (kind, index) tuples,
+# where index is the flat cell index r * cols + c, and returning a
+# SearchResult (or None when no path exists).
+VISIT = 0      # node popped / expanded
+PUSH = 1       # node added to the frontier
+PUSH_BACK = 2  # node added to the backward frontier (bidirectional searches)
+PATH = 3       # cell on the final path, emitted from start to end
+
+
+def pack_event(kind, index):
+    """Encode an event as one int (fits an array('i') event log)."""
+    return index << 2 | kind
+
+
+def unpack_event(code):
+    return code & 3, code >> 2
+
+
+@dataclass
+class SearchResult:
+    visited: int
+    path: list = field(default_factory=list)
+    stats: dict = field(default_factory=dict)  # solver-specific counters, e.g. open-set pushes
+
+    @property
+    def path_length(self):
+        return max(len(self.path) - 1, 0)
+
+
+def record_events(steps, start, end, cols, times=None):
+    """Drain a step generator into the packed event log FrameAnimation would record.
+
+    Returns (SearchResult or None, events); expansions and the endpoint
+    cells are left out, as on the canvas. If `times` is an array('Q'), it
+    gets each event's timestamp in microseconds since the run began (see
+    maze.trace).
+    """
+    events = array("i")
+    append = events.append
+    skip = (start[0] * cols + start[1], end[0] * cols + end[1])
+    advance = steps.__next__
+    began = perf_counter()
+    try:
+        while True:
+            kind, index = advance()
+            if kind != VISIT and index not in skip:
+                append(pack_event(kind, index))
+                if times is not None:
+                    times.append(int((perf_counter() - began) * 1e6))
+    except StopIteration as done:
+        return done.value, events
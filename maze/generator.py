@@ -0,0 +1,171 @@
+import random
+
+from maze.grid import OPEN, WALL
+
+
+def carve_recursive_backtracker(grid, braid=0.18, avoid_2x2=True, avoid_stranded=True, rng=random):
+    """Fill `grid` with walls and carve a perfect maze, then braid some dead ends.
+
+    Works directly on the grid buffer, so it runs headless; pass a seeded
+    random.Random as `rng` for reproducible mazes.
+    """
+    rows, cols = grid.rows, grid.cols
+    cells = grid.cells
+    cells[:] = bytes([WALL]) * len(cells)
+
+    visited = bytearray(rows * cols)
+
+    def is_valid(r, c):
+        return (0 <= r < rows) and (0 <= c < cols) and (r % 2 == 1 and c % 2 == 1)
+
+    def enter(r, c):
+        directions = [(-2, 0), (2, 0), (0, -2), (0, 2)]
+        rng.shuffle(directions)
+        visited[r * cols + c] = 1
+        cells[r * cols + c] = OPEN
+        return (r, c, iter(directions))
+
+    # iterative depth-first carve (same visiting order as the recursive version)
+    stack = [enter(rng.randrange(1, rows, 2), rng.randrange(1, cols, 2))]
+    while stack:
+        r, c, directions = stack[-1]
+        for dr, dc in directions:
+            nr, nc = r + dr, c + dc
+            if is_valid(nr, nc) and not visited[nr * cols + nc]:
+                cells[(r + dr // 2) * cols + (c + dc // 2)] = OPEN
+                stack.append(enter(nr, nc))
+                break
+        else:
+            stack.pop()
+
+    # ----- braiding helpers -----
+    def is_wall(r, c):
+        return 0 <= r < rows and 0 <= c < cols and cells[r * cols + c] == WALL
+
+    def wall_degree(r, c):
+        deg = 0
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            if is_wall(r + dr, c + dc):
+                deg += 1
+        return deg
+
+    def is_between_two_open_cells(r, c):
+        i = r * cols + c
+        if cells[i] != WALL:
+            return False
+        if (r % 2 == 0) and (c % 2 == 1):
+            if 0 < r < rows - 1:
+                return cells[i - cols] == OPEN and cells[i + cols] == OPEN
+        if (r % 2 == 1) and (c % 2 == 0):
+            if 0 < c < cols - 1:
+                return cells[i - 1] == OPEN and cells[i + 1] == OPEN
+        return False
+
+    def would_create_2x2_open(r, c):
+        candidates = [(r - 1, c - 1), (r - 1, c), (r, c - 1), (r, c)]
+        for i, j in candidates:
+            if 0 <= i < rows - 1 and 0 <= j < cols - 1:
+                open_count = 0
+                for rr, cc in ((i, j), (i + 1, j), (i, j + 1), (i + 1, j + 1)):
+                    if (rr, cc) == (r, c):
+                        continue
+                    if cells[rr * cols + cc] == OPEN:
+                        open_count += 1
+                if open_count == 3:
+                    return True
+        return False
+
+    def would_create_stranded_wall(r, c):
+        if cells[r * cols + c] != WALL:
+            return False
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nr, nc = r + dr, c + dc
+            if is_wall(nr, nc) and wall_degree(nr, nc) <= 1:
+                return True
+        return False
+
+    if braid > 0.0:
+        for r in range(1, rows - 1):
+            for c in range(1, cols - 1):
+                if is_between_two_open_cells(r, c) and rng.random() < braid:
+                    if avoid_2x2 and would_create_2x2_open(r, c):
+                        continue
+                    if avoid_stranded and would_create_stranded_wall(r, c):
+                        continue
+                    cells[r * cols + c] = OPEN
+
+    grid.touch()
+
+
+def open_and_attach(grid, cell):
+    """Ensure `cell` is open and connected to at least one open 4-neighbor."""
+    r, c = cell
+    # open this cell if it's a wall
+    if grid.get(r, c) == WALL:
+        grid.set(r, c, OPEN)
+
+    # if all 4-neighbors are walls, open one neighbor (prefer odd/odd corridor direction)
+    neighbors = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if any(grid.is_open(r + dr, c + dc) for dr, dc in neighbors):
+        return
+    # choose a neighbor that moves toward odd indices when possible
+    candidates = []
+    for dr, dc in neighbors:
+        nr, nc = r + dr, c + dc
+        if grid.in_bounds(nr, nc):
+            score = 0
+            if nr % 2 == 1: score += 1
+            if nc % 2 == 1: score += 1
+            candidates.append((score, nr, nc))
+    if candidates:
+        candidates.sort(reverse=True)
+        _, nr, nc = candidates[0]
+        grid.set(nr, nc, OPEN)
+
+
+def place_endpoints(grid, start=None, end=None, rng=random):
+    """Keep the given start/end (opening them up) and pick any missing one at random.
+
+    Returns (start, end). Raises ValueError when the grid has no room for them.
+    """
+    open_cells = grid.open_cells()
+
+    if start is not None and end is not None:
+        # keep existing locations
+        open_and_attach(grid, start)
+        open_and_attach(grid, end)
+
+    elif start is not None:
+        open_and_attach(grid, start)
+        choices = [cell for cell in open_cells if cell != start]
+        if not choices:
+            raise ValueError("No empty cell available for end.")
+        end = rng.choice(choices)
+
+    elif end is not None:
+        open_and_attach(grid, end)
+        choices = [cell for cell in open_cells if cell != end]
+        if not choices:
+            raise ValueError("No empty cell available for start.")
+        start = rng.choice(choices)
+
+    else:
+        # none existed: pick both
+        if len(open_cells) < 2:
+            raise ValueError("No empty cells for start and end.")
+        start = rng.choice(open_cells)
+        end = rng.choice([cell for cell in open_cells if cell != start])
+
+    # if by any chance both equal, re-pick end
+    if start == end:
+        fallback = [cell for cell in open_cells if cell != start]
+        if fallback:
+            end = rng.choice(fallback)
+
+    return start, end
+
+
+def generate_maze(grid, start=None, end=None, rng=random, **options):
+    """Carve a maze into `grid` and place endpoints. Returns (start, end)."""
+    carve_recursive_backtracker(grid, rng=rng, **options)
+    return place_endpoints(grid, start, end, rng=rng)
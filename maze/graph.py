@@ -0,0 +1,151 @@
+from array import array
+
+from maze.utils import DIRS_4, load_numpy
+
+# cell value -> 1 for open, 0 for walls (and every other value)
+OPEN_TO_PASSABLE = bytes([1]) + bytes(255)
+
+
+def pad_cells(grid, table=OPEN_TO_PASSABLE):
+    """The grid's cells as a bytearray in the wall-padded layout, mapped through `table`.
+
+    The layout adds one ring of cells around the grid, so a row is
+    cols + 2 wide and cell (r, c) is node (r + 1) * width + c + 1; the ring
+    is 0. Structures built on it (GridGraph, ComponentIndex, LPAStar,
+    JumpTable, HierarchicalMap) never need a bounds check.
+    """
+    rows, cols = len(grid), len(grid[0])
+    width = cols + 2
+    padded = bytearray((rows + 2) * width)
+    for r in range(rows):
+        base = (r + 1) * width + 1
+        padded[base:base + cols] = bytes(grid[r]).translate(table)
+    return padded
+
+
+def padded_node(index, cols):
+    """Flat cell index (r * cols + c) -> node of the wall-padded layout."""
+    return index + 2 * (index // cols) + cols + 3
+
+
+def flat_index(node, width):
+    """Node of the wall-padded layout -> flat cell index (r * cols + c)."""
+    return node - width + 1 - 2 * (node // width)
+
+
+def derived_for(grid, key, build):
+    """Return grid.derived[key], patched with the grid's edits since it was built.
+
+    The cached structure needs a `version` and an update_cells(indexes)
+    method; build() makes a fresh one when there is none, or when the
+    grid's edit log no longer reaches back to its version. Grids without
+    `derived` get a fresh build on every call.
+    """
+    derived = getattr(grid, "derived", None)
+    if derived is None:
+        return build()
+    item = derived.get(key)
+    if item is not None and item.version != grid.version:
+        edits = grid.edits_since(item.version)
+        if edits is None:
+            item = None
+        else:
+            item.update_cells(edits)
+    if item is None:
+        item = derived[key] = build()
+    return item
+
+
+class GridGraph:
+    """Compact graph view of a maze, built once per maze and movement mode.
+
+    Nodes are flat indexes into a grid padded with one ring of walls, so
+    neighbor lookups never need a bounds check. Adjacency is stored CSR-style:
+    the open neighbors of node i (in `dirs` order) are
+    targets[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, grid, dirs=DIRS_4):
+        rows, cols = len(grid), len(grid[0])
+        width = cols + 2
+        size = (rows + 2) * width
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.size = size
+        self.dirs = tuple(dirs)
+        self.deltas = tuple(dr * width + dc for dr, dc in dirs)
+
+        self.passable = pad_cells(grid)
+
+        # numpy is optional; it only speeds up the CSR build
+        np = load_numpy()
+        if np is not None:
+            self.offsets, self.targets = self._build_csr_numpy(np)
+        else:
+            self.offsets, self.targets = self._build_csr()
+
+    def _build_csr(self):
+        passable, deltas = self.passable, self.deltas
+        offsets = array("i", bytes(4 * (self.size + 1)))
+        targets = array("i")
+        append = targets.append
+        for i in range(self.size):
+            if passable[i]:
+                for d in deltas:
+                    if passable[i + d]:
+                        append(i + d)
+            offsets[i + 1] = len(targets)
+        return offsets, targets
+
+    def _build_csr_numpy(self, np):
+        passable = np.frombuffer(self.passable, dtype=np.uint8).view(bool)
+        nodes = np.flatnonzero(passable).astype(np.int32)
+        candidates = nodes[:, None] + np.array(self.deltas, dtype=np.int32)[None, :]
+        valid = passable[candidates]
+        counts = np.zeros(self.size + 1, dtype=np.int32)
+        counts[nodes + 1] = valid.sum(axis=1)
+        offsets = array("i")
+        offsets.frombytes(np.cumsum(counts, dtype=np.int32).tobytes())
+        targets = array("i")
+        targets.frombytes(candidates[valid].astype(np.int32).tobytes())
+        return offsets, targets
+
+    def node(self, r, c):
+        return (r + 1) * self.width + c + 1
+
+    def cell(self, i):
+        r, c = divmod(i, self.width)
+        return r - 1, c - 1
+
+    def index(self, i):
+        """Node id -> unpadded flat cell index (r * cols + c)."""
+        return flat_index(i, self.width)
+
+    def neighbors(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def trace(self, parents, source, target):
+        """Follow a parents array from target back to source; returns (r, c) cells."""
+        path = []
+        i = target
+        while i != source:
+            path.append(self.cell(i))
+            i = parents[i]
+        path.append(self.cell(source))
+        path.reverse()
+        return path
+
+
+def graph_for(grid, dirs=DIRS_4):
+    """Return the GridGraph for `grid`, reusing the cached one while the grid is unchanged."""
+    derived = getattr(grid, "derived", None)
+    if derived is None:
+        return GridGraph(grid, dirs)
+    key = ("graph", tuple(dirs))
+    cached = derived.get(key)
+    if cached is not None and cached[0] == grid.version:
+        return cached[1]
+    graph = GridGraph(grid, dirs)
+    derived[key] = (grid.version, graph)
+    return graph
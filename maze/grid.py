@@ -0,0 +1,172 @@
+from maze.utils import load_numpy
+
+OPEN = 0
+WALL = 1
+
+# cost of stepping onto a cell unless set_cost() says otherwise
+DEFAULT_COST = 1
+
+# set() calls remembered for incremental consumers (see Grid.edits_since)
+EDIT_LOG_LIMIT = 4096
+
+
+class Grid:
+    """Maze cells stored row-major in one contiguous uint8 buffer (0 open, 1 wall).
+
+    grid[r][c] reads through a read-only row view, so existing code that
+    indexes a list of lists keeps working. Writes go through set()/fill(),
+    which bump `version` so derived structures know when to rebuild.
+    `array` exposes the same buffer as a (rows, cols) ndarray without copying.
+    `costs` is a parallel terrain layer: the cost of stepping onto each cell
+    (1-255, DEFAULT_COST everywhere until set_cost() paints mud or roads).
+    `derived` holds structures built from the cells (see maze.graph.graph_for),
+    each stored next to the version it was built from; structures that can
+    repair themselves ask edits_since() which cells changed.
+    """
+
+    def __init__(self, rows, cols, fill=OPEN):
+        self.rows = rows
+        self.cols = cols
+        self.cells = bytearray([fill]) * (rows * cols)
+        self.costs = bytearray([DEFAULT_COST]) * (rows * cols)
+        self.version = 0
+        self.derived = {}
+        self._edits = []
+        self._edits_from = 0
+        self._bind_rows()
+
+    def _bind_rows(self):
+        view = memoryview(self.cells).toreadonly()
+        cols = self.cols
+        self._rows = [view[r * cols:(r + 1) * cols] for r in range(self.rows)]
+
+    @classmethod
+    def from_rows(cls, rows):
+        grid = cls(len(rows), len(rows[0]) if rows else 0)
+        grid.cells[:] = bytes(v for row in rows for v in row)
+        return grid
+
+    def to_rows(self):
+        return [list(row) for row in self._rows]
+
+    def copy(self):
+        grid = Grid(self.rows, self.cols)
+        grid.cells[:] = self.cells
+        grid.costs[:] = self.costs
+        return grid
+
+    def __getstate__(self):
+        return {"rows": self.rows, "cols": self.cols, "cells": bytes(self.cells), "costs": bytes(self.costs),
+                "version": self.version}
+
+    def __setstate__(self, state):
+        self.rows = state["rows"]
+        self.cols = state["cols"]
+        self.cells = bytearray(state["cells"])
+        self.costs = bytearray(state.get("costs") or bytes([DEFAULT_COST]) * len(self.cells))
+        self.version = state["version"]
+        self.derived = {}
+        self._edits = []
+        self._edits_from = self.version
+        self._bind_rows()
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, r):
+        return self._rows[r]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __eq__(self, other):
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return (self.rows == other.rows and self.cols == other.cols
+                and self.cells == other.cells and self.costs == other.costs)
+
+    def index(self, r, c):
+        return r * self.cols + c
+
+    def cell(self, index):
+        return divmod(index, self.cols)
+
+    def in_bounds(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def is_open(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols and self.cells[r * self.cols + c] == OPEN
+
+    def get(self, r, c):
+        return self.cells[r * self.cols + c]
+
+    def set(self, r, c, value):
+        index = r * self.cols + c
+        self.cells[index] = value
+        self._log_edit(index)
+
+    def cost(self, r, c):
+        return self.costs[r * self.cols + c]
+
+    def set_cost(self, r, c, cost):
+        index = r * self.cols + c
+        self.costs[index] = cost
+        self._log_edit(index)
+
+    @property
+    def weighted(self):
+        """True when any cell costs something other than DEFAULT_COST."""
+        return self.costs.count(DEFAULT_COST) != len(self.costs)
+
+    def _log_edit(self, index):
+        self.version += 1
+        edits = self._edits
+        edits.append(index)
+        if len(edits) > EDIT_LOG_LIMIT:
+            drop = len(edits) // 2
+            del edits[:drop]
+            self._edits_from += drop
+
+    def fill(self, value):
+        """Set every cell to `value` and clear the terrain back to DEFAULT_COST."""
+        self.cells[:] = bytes([value]) * len(self.cells)
+        self.costs[:] = bytes([DEFAULT_COST]) * len(self.costs)
+        self.touch()
+
+    def touch(self):
+        """Mark the grid as modified after writing to `cells` or `array` directly."""
+        self.version += 1
+        self._edits.clear()
+        self._edits_from = self.version
+
+    def edits_since(self, version):
+        """Flat indexes written by set()/set_cost() after `version`, or None if they are no longer known."""
+        if version < self._edits_from or version > self.version:
+            return None
+        return self._edits[version - self._edits_from:]
+
+    def open_cells(self):
+        cols = self.cols
+        return [divmod(i, cols) for i, v in enumerate(self.cells) if v == OPEN]
+
+    # ----- vectorized views (numpy) -----
+    @property
+    def array(self):
+        np = load_numpy()
+        if np is None:
+            raise RuntimeError("numpy is required for Grid.array")
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows, self.cols)
+
+    def open_mask(self):
+        return self.array == OPEN
+
+    def neighbor_counts(self, dirs, value=OPEN):
+        """Count, for every cell, the in-bounds neighbors along `dirs` equal to `value`."""
+        mask = self.array == value
+        np = load_numpy()
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = mask
+        counts = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        for dr, dc in dirs:
+            counts += padded[1 + dr:1 + dr + self.rows, 1 + dc:1 + dc + self.cols]
+        return counts
@@ -1,16 +1,31 @@
-import sys
 import tkinter as tk 
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 import customtkinter as ctk
-import random
-import time
-from time import perf_counter
-from maze.utils import reset_canvas_colors, DIRS_4, DIRS_8, manhattan_distance, chebyshev_distance
-from maze.algorithms import bfs, a_star, bidirectional_bfs, dfs, jps
-
-sys.setrecursionlimit(5000)
+import os
+from array import array
+from contextlib import ExitStack
+from maze.utils import reset_canvas_colors, movement
+from maze.algorithms import FrameAnimation, TracePlayer, paint_events
+from maze.events import PATH, unpack_event
+from maze.solvers import SOLVERS
+from maze.cache import SolveCache
+from maze.grid import Grid
+from maze.components import reachable
+from maze.graph import graph_for
+from maze.weighted import path_cost
+from maze.instrument import count_steps, format_counters, peak_memory, solver_options
+from maze.profiling import PROFILE_DIR, profiled
+from maze.generator import carve_recursive_backtracker, place_endpoints
+from maze.cells import make_cells
+from maze.trace import TRACE_DIR, TRACE_SUFFIX, Trace, load_trace, save_trace, trace_path
+
+# how often the window checks on a parallel comparison's worker processes
+COMPARE_POLL_MS = 20
+
+# replay speeds offered next to the trace scrubber, as multiples of the solver's own pace
+REPLAY_SPEEDS = ("1x", "0.1x", "0.01x", "0.001x")
 
 #Size constants for the maze grid
 CELL_SIZE = 10
@@ -23,13 +38,23 @@ PATH_COLOR = "#E3FC00"
 START_COLOR = "#00FF00"
 END_COLOR = "#FF0000"
 WALL_COLOR = "#000A38"
+MUD_COLOR = "#A1887F"
+MUD_COST = 5
 BUTTON_COLOR = "#DDDDDD"
 BACKGROUND_COLOR = "#F0F0F0"
+# longest side of the maze canvas in pixels when the cell size is picked to fit
+MAX_CANVAS = GRID_ROWS * CELL_SIZE
+
+
+def format_seconds(seconds):
+    """Timer readout in milliseconds with microsecond resolution."""
+    return f"{seconds * 1000:.3f} ms"
 
 
 class MazeGUI:
     """A GUI for visualizing the maze."""
-    def __init__(self, root, visited_label=None, path_label=None, time_label=None, best_label=None, algorithm_buttons = None, result_label=None):
+    def __init__(self, root, visited_label=None, path_label=None, time_label=None, best_label=None, algorithm_buttons = None, result_label=None,
+                 rows=GRID_ROWS, cols=GRID_COLS, cell_size=CELL_SIZE, renderer=None):
 
         self.root = root
         self.start_cell = None 
@@ -42,7 +67,27 @@ class MazeGUI:
         self.delay_value = tk.DoubleVar(value=5)
         self.algorithm_buttons = algorithm_buttons
         self.move_mode = tk.StringVar(value="4")
+        self.brush = tk.StringVar(value="Wall")
+        self.parallel_compare = tk.BooleanVar(value=False)
+        self.replay_compare = tk.BooleanVar(value=True)
+        self.instrument = tk.BooleanVar(value=False)
+        self.profile_runs = tk.BooleanVar(value=False)
+        self.last_profile = None
+        self.counters_label = None
+        self.last_counters = None
+        self.last_timings = None
+        self.last_cost = None
+        self.last_trace = None
+        self.replay = None
+        self.replay_speed = tk.StringVar(value="0.01x")
+        self.replay_slider = None
+        self.replay_label = None
+        self.replay_btn = None
         self.run_token = 0
+        self.animation = None
+        # workers of stopped runs that may still be closing their solver (see stop_animation)
+        self.stale_workers = []
+        self.solve_cache = SolveCache()
 
         self.paused = False
         self.overlay_drawings = []
@@ -59,64 +104,57 @@ class MazeGUI:
         self.fastest_algo = None
         self.best_label = best_label
 
-        self._pause_total = 0.0
-        self._pause_started_at = None
 
-
-        self.canvas = tk.Canvas(root, width=GRID_COLS * CELL_SIZE, height=GRID_ROWS * CELL_SIZE)
+        self.cell_size = cell_size
+        self.canvas = tk.Canvas(root, width=cols * cell_size, height=rows * cell_size)
         self.canvas.pack()
     
         self.canvas.bind("<Button-3>", self.on_right_click)
-        self.grid = [[0 for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
-        self.rectangles = [[None for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
-
-        self.draw_grid()
+        self.grid = Grid(rows, cols)
+        self.draw_grid(renderer)
 
         self.canvas.bind("<ButtonPress-1>", self.on_left_press)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_left_release)
 
-    def draw_grid(self): 
-        for row in range(GRID_ROWS):
-            for col in range(GRID_COLS):
-                x1 = col * CELL_SIZE
-                y1 = row * CELL_SIZE
-                x2 = x1 + CELL_SIZE
-                y2 = y1 + CELL_SIZE
-                rect = self.canvas.create_rectangle(x1, y1, x2, y2, fill=BACKGROUND_COLOR, outline="")
-                
-                self.rectangles[row][col] = rect
+    def draw_grid(self, renderer=None):
+        """Create the cell surface: a rectangle per cell, or one bitmap for big grids (see maze.cells)."""
+        self.cells = make_cells(self.canvas, self.grid.rows, self.grid.cols, self.cell_size, BACKGROUND_COLOR, renderer)
+
+    def paint_cell(self, row, col, color):
+        self.cells.set(row * self.grid.cols + col, color)
+        self.cells.flush()
 
     def on_right_click(self, event):
         if self.paused:
             return
-        col = event.x // CELL_SIZE
-        row = event.y // CELL_SIZE
+        col = event.x // self.cell_size
+        row = event.y // self.cell_size
         if self.is_running:
             messagebox.showinfo("Error", "Cannot change start and end while an algorithm is running, try to reset run")
             return 
-        if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
+        if self.grid.in_bounds(row, col):
            if self.grid[row][col] == 1:
                 messagebox.showinfo("Error", "Cannot set start and end on a wall")
                 return 
            
            if self.start_cell is None:
                self.start_cell = (row, col)
-               self.canvas.itemconfig(self.rectangles[row][col], fill=START_COLOR)
+               self.paint_cell(row, col, START_COLOR)
            elif self.end_cell is None:
                 self.end_cell = (row, col)
-                self.canvas.itemconfig(self.rectangles[row][col], fill=END_COLOR)
+                self.paint_cell(row, col, END_COLOR)
            else:
                s_row, s_col = self.start_cell
                e_row, e_col = self.end_cell
-               self.canvas.itemconfig(self.rectangles[s_row][s_col], fill=BACKGROUND_COLOR)
-               self.canvas.itemconfig(self.rectangles[e_row][e_col], fill=BACKGROUND_COLOR)
+               self.paint_cell(s_row, s_col, self.cell_color(s_row, s_col))
+               self.paint_cell(e_row, e_col, self.cell_color(e_row, e_col))
                self.start_cell = (row, col)
                self.end_cell = None
-               self.canvas.itemconfig(self.rectangles[row][col], fill=START_COLOR)
+               self.paint_cell(row, col, START_COLOR)
            if self.start_cell == self.end_cell: # Cannot set start and end on same cell
                self.end_cell = None
-               self.canvas.itemconfig(self.rectangles[row][col], fill=START_COLOR)
+               self.paint_cell(row, col, START_COLOR)
                messagebox.showinfo("Error", "Cannot set start and end on same spot")
                return
 
@@ -126,6 +164,7 @@ class MazeGUI:
         if self.is_running:
             messagebox.showinfo("Error", "Cannot change maze while an algorithem is running, try to reset run")
             return 
+        self.settle_workers()
         self.drawing_wall = True
         self.toggle_wall(event)
         
@@ -141,44 +180,79 @@ class MazeGUI:
         self.drawing_wall = False
 
     def modify_wall(self, event):
-        col = event.x // CELL_SIZE
-        row = event.y // CELL_SIZE
+        col = event.x // self.cell_size
+        row = event.y // self.cell_size
 
-        if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
+        if self.grid.in_bounds(row, col):
             if (row, col) == self.start_cell or (row, col) == self.end_cell:
                 return
             
-            if self.grid[row][col] == 0:
-                self.grid[row][col] = 1
-                self.canvas.itemconfig(self.rectangles[row][col], fill=WALL_COLOR)
+            if self.brush.get() == "Mud":
+                self.paint_mud(row, col)
+            elif self.grid[row][col] == 0:
+                self.grid.set(row, col, 1)
+                self.paint_cell(row, col, WALL_COLOR)
             
     def toggle_wall(self, event):
-        col = event.x // CELL_SIZE
-        row = event.y // CELL_SIZE
+        col = event.x // self.cell_size
+        row = event.y // self.cell_size
 
-        if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
+        if self.grid.in_bounds(row, col):
             if (row, col) == self.start_cell or (row, col) == self.end_cell:
                 return
             
-            if self.grid[row][col] == 1:
-                self.grid[row][col] = 0
-                self.canvas.itemconfig(self.rectangles[row][col], fill=BACKGROUND_COLOR)
+            if self.brush.get() == "Mud":
+                self.paint_mud(row, col, toggle=True)
+            elif self.grid[row][col] == 1:
+                self.grid.set(row, col, 0)
+                self.paint_cell(row, col, self.cell_color(row, col))
             else:
-                self.grid[row][col] = 1
-                self.canvas.itemconfig(self.rectangles[row][col], fill=WALL_COLOR)
+                self.grid.set(row, col, 1)
+                self.paint_cell(row, col, WALL_COLOR)
 
     def draw_wall(self, event):
-        col = event.x // CELL_SIZE
-        row = event.y // CELL_SIZE
+        col = event.x // self.cell_size
+        row = event.y // self.cell_size
         self.generated_maze = False
 
-        if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
+        if self.grid.in_bounds(row, col):
             if (row, col) == self.start_cell or (row, col) == self.end_cell:
                 return
             
-            if self.grid[row][col] == 0:
-                self.grid[row][col] = 1
-                self.canvas.itemconfig(self.rectangles[row][col], fill=WALL_COLOR)
+            if self.brush.get() == "Mud":
+                self.paint_mud(row, col)
+            elif self.grid[row][col] == 0:
+                self.grid.set(row, col, 1)
+                self.paint_cell(row, col, WALL_COLOR)
+
+    def paint_mud(self, row, col, toggle=False):
+        """Make an open cell cost MUD_COST to enter (or, when toggling, clear mud back to normal ground)."""
+        if self.grid[row][col] != 0:
+            return
+        cost = 1 if toggle and self.grid.cost(row, col) != 1 else MUD_COST
+        if self.grid.cost(row, col) != cost:
+            self.grid.set_cost(row, col, cost)
+        self.paint_cell(row, col, self.cell_color(row, col))
+
+    def cell_color(self, row, col):
+        """Resting color of a cell from the grid: wall, mud or plain ground."""
+        return self.resting_color(row * self.grid.cols + col)
+
+    def resting_color(self, index):
+        if self.grid.cells[index] == 1:
+            return WALL_COLOR
+        return MUD_COLOR if self.grid.costs[index] != 1 else BACKGROUND_COLOR
+
+    def path_cost(self, events):
+        """Weighted cost of the path painted by a recorded run (start and end are not recorded)."""
+        costs = self.grid.costs
+        er, ec = self.end_cell
+        total = costs[er * self.grid.cols + ec]
+        for code in events:
+            kind, index = unpack_event(code)
+            if kind == PATH:
+                total += costs[index]
+        return total
 
     def highlight_button(self, name):
         self.reset_button_colors()
@@ -190,16 +264,6 @@ class MazeGUI:
         for button in self.algorithm_buttons.values():
             button.configure(fg_color="#1f6aa5", hover_color= "#144870")
     
-    def make_pause_wait(self):
-        def pause_wait():
-            while self.paused and not self.stop_requested:
-                try:
-                    self.canvas.update()
-                except Exception:
-                    break
-                time.sleep(0.01)
-        return pause_wait
-
     def overlay_left_press(self, event):
         self._overlay_prev = (event.x, event.y)
 
@@ -216,27 +280,22 @@ class MazeGUI:
     def overlay_left_release(self, event):
         self._overlay_prev = None
 
-    def _pause_start(self):
-        if self._pause_started_at is None:
-            self._pause_started_at = perf_counter()
-
-    def _pause_end(self):
-        try:
-            if self._pause_started_at is not None:
-                self._pause_total += perf_counter() - self._pause_started_at
-                self._pause_started_at = None
-        except Exception:
-            self._pause_started_at = None
-
     def toggle_pause(self):
         if not (self.paused or self.is_running):
             messagebox.showinfo("Info", "No algorithm is running.")
             return
+        if self.animation is None and not self.paused:
+            # a parallel comparison runs in other processes; there is nothing to pause
+            return
 
         self.paused = not self.paused 
+        if self.animation is not None:
+            if self.paused:
+                self.animation.pause()
+            else:
+                self.animation.resume()
 
         if self.paused:
-            self._pause_start()
             self.canvas.bind("<ButtonPress-1>", self.overlay_left_press)
             self.canvas.bind("<B1-Motion>", self.overlay_mouse_drag)
             self.canvas.bind("<ButtonRelease-1>", self.overlay_left_release)
@@ -245,7 +304,6 @@ class MazeGUI:
             if hasattr(self, "pause_btn"):
                 self.pause_btn.configure(text="Resume Run (space)")
         else:
-            self._pause_end()
             for item_id in self.overlay_drawings:
                 self.canvas.delete(item_id)
             self.overlay_drawings.clear()
@@ -259,15 +317,66 @@ class MazeGUI:
             if hasattr(self, "pause_btn"):
                 self.pause_btn.configure(text="Pause Run (space)")
 
-    def run_search(self, algorithm="BFS"):
+    def _lock_run(self):
+        try:
+            if hasattr(self, "move_toggle"):
+                self.move_toggle.configure(state="disabled")
+            for algo in self.algorithm_buttons.values():
+                algo.configure(state="disabled")
+            if hasattr(self, "pause_btn"):
+                self.pause_btn.configure(state="disabled")
+        except Exception:
+            pass
+
+    def _unlock_run(self):
+        self.is_running = False
+        try:
+            if hasattr(self, "move_toggle"):
+                self.move_toggle.configure(state="normal")
+            for algo in self.algorithm_buttons.values():
+                algo.configure(state="normal")
+        except Exception:
+            pass
+
+    def stop_animation(self):
+        """End the animated run, if any; it still reports back through its on_done.
+
+        The worker is not waited for: a solver deep in building a derived
+        structure would freeze the window. Its output is dropped, and it is
+        joined before the grid changes or a new run starts searching (see
+        settle_workers).
+        """
+        animation, self.animation = self.animation, None
+        if animation is not None:
+            animation.stop(wait=False)
+            self.stale_workers = [w for w in self.stale_workers if w.thread.is_alive()] + [animation.worker]
+
+    def settle_workers(self):
+        """Wait until stopped runs have let go of the grid's derived structures."""
+        for worker in self.stale_workers:
+            worker.stop()
+        self.stale_workers = []
+
+    def run_search(self, algorithm="BFS", profile=None, on_done=None):
+        """Start animating one algorithm; returns at once.
+
+        The solver runs on a worker thread and the Tk event loop paints
+        what it finds (see FrameAnimation).
+
+        `profile` is True/"pstats" or "collapsed" to profile the run (see
+        maze.profiling), False not to; None follows the Profile toggle.
+        on_done() is called when the run ends: found, not found, stopped
+        or replaced by a newer run.
+        """
         if self.was_run:
             self.reset_algorithm_visuals()
+        self.stop_replay()
+        profiler = self._profiler(profile)
 
         if self.result_label:
             self.result_label.configure(text="Result: Searching...")
 
-        dirs = DIRS_8 if self.move_mode.get() == "8" else DIRS_4
-        heuristic = manhattan_distance if self.move_mode.get() == "4" else chebyshev_distance
+        dirs, heuristic = movement(self.move_mode.get())
 
         self.stop_requested = False
         self.is_running = True
@@ -280,9 +389,6 @@ class MazeGUI:
         except Exception:
             pass
 
-        self._pause_total = 0.0
-        self._pause_started_at = None
-
         if self.paused:
             self.paused = False
 
@@ -293,108 +399,119 @@ class MazeGUI:
 
         if self.start_cell is None or self.end_cell is None:
             messagebox.showwarning("Error", "Start or end cell not set.")
-            self.is_running = False
             self.was_run = False
-            try:
-                if hasattr(self, "move_toggle"):
-                    self.move_toggle.configure(state="normal")
-                for algo in self.algorithm_buttons.values():
-                    algo.configure(state="normal")
-            except Exception:
-                pass
+            self._unlock_run()
             return
 
-        pause_wait = self.make_pause_wait()
-
-        start_time = perf_counter()
-        visited = 0
-        path_length = 0
-        result = None
+        self.last_cost = None
 
         self.highlight_button(algorithm)
 
-        if algorithm == "BFS":
-            result = bfs(self.grid, self.start_cell, self.end_cell, self.rectangles,
-                        self.canvas, stop_flag, self.delay_value, dirs, pause_wait)
-        elif algorithm == "A*":
-            result = a_star(self.grid, self.start_cell, self.end_cell, self.rectangles,
-                            self.canvas, stop_flag, self.delay_value, dirs, heuristic, pause_wait)
-        elif algorithm == "Bi BFS":
-            result = bidirectional_bfs(self.grid, self.start_cell, self.end_cell, self.rectangles,
-                                    self.canvas, stop_flag, self.delay_value, dirs, pause_wait)
-        elif algorithm == "DFS":
-            result = dfs(self.grid, self.start_cell, self.end_cell, self.rectangles,
-                        self.canvas, stop_flag, self.delay_value, dirs, pause_wait)
-        elif algorithm == "JPS":
-            if self.move_mode.get() != "4":
-                self.reset_button_colors()
-                self.is_running = False
-                try:
-                    if hasattr(self, "move_toggle"):
-                        self.move_toggle.configure(state="normal")
-                    for algo in self.algorithm_buttons.values():
-                        algo.configure(state="normal")
-                except Exception:
-                    pass
-                messagebox.showinfo("Unsupported", "JPS supports 4-direction movement only.")
-                return
-            if not self.generated_maze:
-                self.reset_button_colors()
-                self.is_running = False
-                try:
-                    if hasattr(self, "move_toggle"):
-                        self.move_toggle.configure(state="normal")
-                    for algo in self.algorithm_buttons.values():
-                        algo.configure(state="normal")
-                except Exception:
-                    pass
-                messagebox.showinfo("Unsupported", "JPS works best with generated mazes. Please create a maze first.")
-                return
-            result = jps(self.grid, self.start_cell, self.end_cell, self.rectangles,
-                        self.canvas, stop_flag, self.delay_value, pause_wait)
-
-        end_time = perf_counter()
-        self._pause_end()
-        run_time = round((end_time - start_time) - self._pause_total, 2)
+        # same maze, endpoints, moves, algorithm and instrumenting as an earlier run: show it instantly
+        cache_key = self.solve_cache.key(self.grid, self.start_cell, self.end_cell, self.move_mode.get(), algorithm,
+                                         instrument=bool(self.instrument.get()))
+        # a profiled run always searches; a cache hit would leave nothing to profile
+        cached = None if profiler else self.solve_cache.get(cache_key)
+        self.last_profile = None
+        timings = {}
+        if cached is not None:
+            result, run_time, events, times, counters = cached
+            self.show_counters(counters)
+            paint_events(events, self.cells, self.canvas)
+            self.keep_trace(algorithm, events, times)
+            self._finish_search(algorithm, result, run_time, events, None, cached=True, on_done=on_done)
+            return
 
-        if stop_flag():
-            self.is_running = False
-            try:
-                if hasattr(self, "move_toggle"):
-                    self.move_toggle.configure(state="normal")
-                for algo in self.algorithm_buttons.values():
-                    algo.configure(state="normal")
-            except Exception:
-                pass
+        events, times = array("i"), array("Q")
+        counters = {} if self.instrument.get() else None
+        if counters is None:
+            steps = SOLVERS[algorithm](self.grid, self.start_cell, self.end_cell, dirs, heuristic)
+        else:
+            steps = SOLVERS[algorithm](self.grid, self.start_cell, self.end_cell, dirs, heuristic,
+                                       **solver_options(algorithm, counters))
+            steps = count_steps(steps, counters)
+
+        # memory tracing stays on until the last frame; the profiler wraps the worker thread
+        contexts = ExitStack()
+        if counters is not None:
+            contexts.enter_context(peak_memory(counters))
+
+        def finished(result):
+            contexts.close()
+            if self.animation is animation:
+                self.animation = None
+            self.last_profile = animation.worker.context_value
+            if self.run_token != my_token:
+                # a newer run took over the canvas
+                if on_done:
+                    on_done()
+                return
+            self.show_counters(counters)
+            # Run time is the solver's own time; painting, the delay and pauses are shown apart
+            run_time = timings["compute"]
+            # a stopped or failed run is incomplete; don't serve it as a cached answer
+            if not stop_flag() and animation.worker.error is None:
+                self.solve_cache.put(cache_key, (result, run_time, events, times, counters), weight=1 + len(events))
+            self.keep_trace(algorithm, events, times)
+            self._finish_search(algorithm, result, run_time, events, timings, on_done=on_done)
+
+        grid, start, end, stale = self.grid, self.start_cell, self.end_cell, self.stale_workers
+
+        def prepare():
+            # on the worker thread, so the window stays responsive: wait for stopped runs to let
+            # go of the shared structures, build the graph every solver uses before the clock
+            # starts (or the first algorithm of a comparison pays for it), and skip the search
+            # when start and end lie in different regions
+            for worker in stale:
+                worker.stop()
+            graph_for(grid, dirs)
+            return reachable(grid, start, end, dirs)
+
+        animation = FrameAnimation(steps, self.start_cell, self.end_cell, self.cells, self.canvas, stop_flag,
+                                   self.delay_value, finished, record=events, timings=timings, times=times,
+                                   context=profiled(algorithm, profiler) if profiler else None,
+                                   prepare=prepare)
+        self.animation = animation
+        animation.start()
+
+    def _finish_search(self, algorithm, result, run_time, events, timings, cached=False, on_done=None):
+        """Show a finished (or stopped) run's stats and unlock the UI."""
+        self.last_timings = dict(timings or {}, compute=run_time)
+
+        if self.stop_requested:
+            self._unlock_run()
+            if on_done:
+                on_done()
             return
 
         if result:
             visited, path_length = result
-            self.result_label.configure(text="Result: Path Found")
+            self.last_cost = self.path_cost(events)
+            self.result_label.configure(text=("Result: Path Found (cached)" if cached else "Result: Path Found") + self._profile_note())
             self.visited_label.configure(text=f"Visited: {visited}")
-            self.path_label.configure(text=f"Path length: {path_length}")
-            self.time_label.configure(text=f"Run time: {run_time} seconds")
+            if self.grid.weighted:
+                self.path_label.configure(text=f"Path length: {path_length} (cost {self.last_cost})")
+            else:
+                self.path_label.configure(text=f"Path length: {path_length}")
+            self.time_label.configure(text=self._time_text(timings, run_time))
             if self.best_time is None or run_time < self.best_time:
                 self.best_time = run_time
                 self.fastest_algo = algorithm
-                self.best_label.configure(text=f"Best: {self.fastest_algo} ({self.best_time} seconds)")
-        elif not stop_flag():
-            self.result_label.configure(text="Result: Path Not Found")
+                self.best_label.configure(text=f"Best: {self.fastest_algo} ({format_seconds(self.best_time)})")
+        else:
+            self.result_label.configure(text="Result: Path Not Found" + self._profile_note())
             self.visited_label.configure(text="Visited: 0")
             self.path_label.configure(text="Path length: 0")
-            self.time_label.configure(text="Run time: 0 seconds")
+            self.time_label.configure(text=self._time_text(timings, run_time))
 
-        self.is_running = False
-        try:
-            if hasattr(self, "move_toggle"):
-                self.move_toggle.configure(state="normal")
-            for algo in self.algorithm_buttons.values():
-                algo.configure(state="normal")
-        except Exception:
-            pass
+        self._unlock_run()
+        if on_done:
+            on_done()
 
     def reset_algorithm_visuals(self):
         self.stop_requested = True
+        self.stop_animation()
+        self.stop_replay()
         self.reset_button_colors()
 
         self.paused = False
@@ -407,21 +524,23 @@ class MazeGUI:
         self.canvas.bind("<ButtonPress-1>", self.on_left_press)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_left_release)
-        
-        try:
-            self._pause_end()
-        except Exception:
-            pass
-        self._pause_total = 0.0
-        self._pause_started_at = None
+
         if hasattr(self, "pause_btn"):
             self.pause_btn.configure(text="Pause Run (space)")
         self.paused = False
         # Clear search/path/time, keep Best
-        reset_canvas_colors(GRID_ROWS, GRID_COLS, self.rectangles, self.canvas, self.start_cell, self.end_cell)
+        # only the cells the run painted go back to their wall / mud / ground color
+        reset_canvas_colors(self.cells, self.canvas, self.start_cell, self.end_cell, self.resting_color)
         self._clear_stats(clear_best=False)
         
+    def show_counters(self, counters):
+        """Show an instrumented run's counters (see maze.instrument); None clears them."""
+        self.last_counters = counters
+        if self.counters_label:
+            self.counters_label.configure(text=format_counters(counters) if counters else "")
+
     def _clear_stats(self, clear_best=False):
+        self.show_counters(None)
         if self.visited_label:
             self.visited_label.configure(text="Visited: 0")
         if self.path_label:
@@ -443,7 +562,9 @@ class MazeGUI:
         end = self.end_cell
         self.generated_maze = False
         self.stop_requested = True
+        self.stop_animation()
         self.was_run = False
+        self.stop_replay()
         self.is_running = False
 
         self.paused = False
@@ -456,212 +577,268 @@ class MazeGUI:
         self.canvas.bind("<ButtonPress-1>", self.on_left_press)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_left_release)
-        
-        try:
-            self._pause_end()
-        except Exception:
-            pass
-        self._pause_total = 0.0
-        self._pause_started_at = None
+
         if hasattr(self, "pause_btn"):
             self.pause_btn.configure(text="Pause Run (space)")
         self.paused = False
 
 
         self._clear_stats(clear_best=True)
+        self.solve_cache.clear()
 
         self.start_cell = None
         self.end_cell = None
 
-        for row in range(GRID_ROWS):
-            for col in range(GRID_COLS):
-                self.grid[row][col] = 0
-                self.canvas.itemconfig(self.rectangles[row][col], fill=BACKGROUND_COLOR)
+        self.settle_workers()
+        self.grid.fill(0)
+        self.cells.fill(BACKGROUND_COLOR)
         if not reset_start:
             self.start_cell = start
             self.end_cell = end
         self.canvas.update()
 
+    def paint_grid(self):
+        """Repaint every cell from the grid buffer, then the start/end markers."""
+        self.cells.load([WALL_COLOR if cell == 1 else MUD_COLOR if cost != 1 else BACKGROUND_COLOR
+                         for cell, cost in zip(self.grid.cells, self.grid.costs)])
+        if self.start_cell:
+            sr, sc = self.start_cell
+            self.paint_cell(sr, sc, START_COLOR)
+        if self.end_cell:
+            er, ec = self.end_cell
+            self.paint_cell(er, ec, END_COLOR)
+
     def generate_maze_recursive_backtracker(self, braid=0.18, avoid_2x2=True, avoid_stranded=True):
     # preserve existing points (even if reset clears them)
         prev_start = self.start_cell
         prev_end = self.end_cell
-        had_start = prev_start is not None
-        had_end = prev_end is not None
 
         self.reset_all(reset_start=False)
 
-        for row in range(GRID_ROWS):
-            for col in range(GRID_COLS):
-                self.grid[row][col] = 1
-                self.canvas.itemconfig(self.rectangles[row][col], fill=WALL_COLOR)
-
-        visited = [[False for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
-
-        def is_valid(cell):
-            r, c = cell
-            return (0 <= r < GRID_ROWS) and (0 <= c < GRID_COLS) and (r % 2 == 1 and c % 2 == 1)
-
-        def carve_passage_from(r, c):
-            directions = [(-2, 0), (2, 0), (0, -2), (0, 2)]
-            random.shuffle(directions)
-            visited[r][c] = True
-            self.grid[r][c] = 0
-            self.canvas.itemconfig(self.rectangles[r][c], fill=BACKGROUND_COLOR)
-
-            for dr, dc in directions:
-                nr, nc = r + dr, c + dc
-                between_r, between_c = r + dr // 2, c + dc // 2
-                if is_valid((nr, nc)) and not visited[nr][nc]:
-                    self.grid[between_r][between_c] = 0
-                    self.canvas.itemconfig(self.rectangles[between_r][between_c], fill=BACKGROUND_COLOR)
-                    carve_passage_from(nr, nc)
-
-        start_r = random.randrange(1, GRID_ROWS, 2)
-        start_c = random.randrange(1, GRID_COLS, 2)
-        carve_passage_from(start_r, start_c)
-        #self.canvas.update()
-
-        # ----- braiding helpers -----
-        def wall_degree(r, c):
-            deg = 0
-            for dr, dc in ((-1,0),(1,0),(0,-1),(0,1)):
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < GRID_ROWS and 0 <= nc < GRID_COLS and self.grid[nr][nc] == 1:
-                    deg += 1
-            return deg
-
-        def is_between_two_open_cells(r, c):
-            if self.grid[r][c] != 1:
-                return False
-            if (r % 2 == 0) and (c % 2 == 1):
-                if 0 < r < GRID_ROWS - 1:
-                    return self.grid[r - 1][c] == 0 and self.grid[r + 1][c] == 0
-            if (r % 2 == 1) and (c % 2 == 0):
-                if 0 < c < GRID_COLS - 1:
-                    return self.grid[r][c - 1] == 0 and self.grid[r][c + 1] == 0
-            return False
-
-        def would_create_2x2_open(r, c):
-            rows, cols = GRID_ROWS, GRID_COLS
-            candidates = [(r - 1, c - 1), (r - 1, c), (r, c - 1), (r, c)]
-            for i, j in candidates:
-                if 0 <= i < rows - 1 and 0 <= j < cols - 1:
-                    cells = [(i, j), (i + 1, j), (i, j + 1), (i + 1, j + 1)]
-                    open_count = 0
-                    for rr, cc in cells:
-                        if (rr, cc) == (r, c):
-                            continue
-                        if self.grid[rr][cc] == 0:
-                            open_count += 1
-                    if open_count == 3:
-                        return True
-            return False
-
-        def would_create_stranded_wall(r, c):
-            if self.grid[r][c] != 1:
-                return False
-            for dr, dc in ((-1,0),(1,0),(0,-1),(0,1)):
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < GRID_ROWS and 0 <= nc < GRID_COLS and self.grid[nr][nc] == 1:
-                    if wall_degree(nr, nc) <= 1:
-                        return True
-            return False
-
-        if braid > 0.0:
-            for r in range(1, GRID_ROWS - 1):
-                for c in range(1, GRID_COLS - 1):
-                    if is_between_two_open_cells(r, c) and random.random() < braid:
-                        if avoid_2x2 and would_create_2x2_open(r, c):
-                            continue
-                        if avoid_stranded and would_create_stranded_wall(r, c):
-                            continue
-                        self.grid[r][c] = 0
-                        self.canvas.itemconfig(self.rectangles[r][c], fill=BACKGROUND_COLOR)
-            self.canvas.update()
-
-        # ----- attach helper: ensure a given cell is open and connected to a corridor -----
-        def open_and_attach(cell):
-            r, c = cell
-            # open this cell if it's a wall
-            if self.grid[r][c] == 1:
-                self.grid[r][c] = 0
-                self.canvas.itemconfig(self.rectangles[r][c], fill=BACKGROUND_COLOR)
-
-            # if all 4-neighbors are walls, open one neighbor (prefer odd/odd corridor direction)
-            neighbors = [(-1,0),(1,0),(0,-1),(0,1)]
-            has_open_neighbor = any(
-                0 <= r+dr < GRID_ROWS and 0 <= c+dc < GRID_COLS and self.grid[r+dr][c+dc] == 0
-                for dr, dc in neighbors
-            )
-            if not has_open_neighbor:
-                # choose a neighbor that moves toward odd indices when possible
-                candidates = []
-                for dr, dc in neighbors:
-                    nr, nc = r + dr, c + dc
-                    if 0 <= nr < GRID_ROWS and 0 <= nc < GRID_COLS:
-                        score = 0
-                        if nr % 2 == 1: score += 1
-                        if nc % 2 == 1: score += 1
-                        candidates.append((score, nr, nc))
-                if candidates:
-                    candidates.sort(reverse=True)
-                    _, nr, nc = candidates[0]
-                    self.grid[nr][nc] = 0
-                    self.canvas.itemconfig(self.rectangles[nr][nc], fill=BACKGROUND_COLOR)
-
-        # ----- place start/end depending on what exists -----
-        open_cells = [(r, c) for r in range(GRID_ROWS) for c in range(GRID_COLS) if self.grid[r][c] == 0]
-
-        if had_start and had_end:
-            # keep existing locations
-            self.start_cell = prev_start
-            self.end_cell = prev_end
-            open_and_attach(self.start_cell)
-            open_and_attach(self.end_cell)
-
-        elif had_start and not had_end:
-            self.start_cell = prev_start
-            open_and_attach(self.start_cell)
-            choices = [cell for cell in open_cells if cell != self.start_cell]
-            if not choices:
-                messagebox.showerror("Error", "No empty cell available for end.")
-                return
-            self.end_cell = random.choice(choices)
-
-        elif had_end and not had_start:
-            self.end_cell = prev_end
-            open_and_attach(self.end_cell)
-            choices = [cell for cell in open_cells if cell != self.end_cell]
-            if not choices:
-                messagebox.showerror("Error", "No empty cell available for start.")
+        carve_recursive_backtracker(self.grid, braid=braid, avoid_2x2=avoid_2x2, avoid_stranded=avoid_stranded)
+        try:
+            self.start_cell, self.end_cell = place_endpoints(self.grid, prev_start, prev_end)
+        except ValueError as e:
+            self.start_cell, self.end_cell = prev_start, prev_end
+            self.paint_grid()
+            messagebox.showerror("Error", str(e))
+            return
+
+        self.paint_grid()
+        self.canvas.update()
+        self.generated_maze = True
+
+    def _time_text(self, timings, compute):
+        text = f"Run time: {format_seconds(compute)} compute"
+        if timings:
+            text += (f"\nRender {format_seconds(timings['render'])}, delay {format_seconds(timings['delay'])},"
+                     f" paused {format_seconds(timings['pause'])}")
+        return text
+
+    def _profiler(self, profile):
+        if profile is None:
+            profile = self.profile_runs.get()
+        return "pstats" if profile is True else profile or None
+
+    def _profile_note(self):
+        return f"\nProfile: {os.path.basename(self.last_profile)}" if self.last_profile else ""
+
+    def toggle_profiling(self):
+        self.profile_runs.set(not self.profile_runs.get())
+        if self.result_label and not self.is_running:
+            state = f"on (files in {PROFILE_DIR}/)" if self.profile_runs.get() else "off"
+            self.result_label.configure(text=f"Profiling: {state}")
+
+    def keep_trace(self, algorithm, events, times):
+        """Remember the shown run as a maze.trace.Trace (with a copy of the maze) for Save Trace."""
+        self.last_trace = Trace(algorithm, self.grid.rows, self.grid.cols, self.start_cell, self.end_cell,
+                                bytes(self.grid.cells), bytes(self.grid.costs), events, times)
+
+    def save_last_trace(self, path=None):
+        if self.last_trace is None:
+            messagebox.showinfo("Info", "Run an algorithm first; its trace is what gets saved.")
+            return None
+        if path is None:
+            default = trace_path(self.last_trace.algorithm)
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            path = filedialog.asksaveasfilename(initialdir=TRACE_DIR, initialfile=os.path.basename(default),
+                                                defaultextension=TRACE_SUFFIX,
+                                                filetypes=[("Maze traces", "*" + TRACE_SUFFIX)])
+            if not path:
+                return None
+        save_trace(path, self.last_trace)
+        if self.result_label:
+            self.result_label.configure(text=f"Trace saved: {os.path.basename(path)} ({len(self.last_trace)} events)")
+        return path
+
+    def open_trace(self, path=None):
+        """Load a saved trace (memory-mapped) with its maze and endpoints, ready to replay."""
+        if self.is_running or self.paused:
+            messagebox.showinfo("Info", "Cannot open a trace while an algorithm is running or paused.")
+            return
+        if path is None:
+            path = filedialog.askopenfilename(initialdir=TRACE_DIR if os.path.isdir(TRACE_DIR) else None,
+                                              filetypes=[("Maze traces", "*" + TRACE_SUFFIX), ("All files", "*")])
+            if not path:
                 return
-            self.start_cell = random.choice(choices)
+        try:
+            trace = load_trace(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if (trace.rows, trace.cols) != (self.grid.rows, self.grid.cols):
+            trace.close()
+            messagebox.showerror("Error", f"The trace is for a {trace.rows}x{trace.cols} grid; this one is "
+                                          f"{self.grid.rows}x{self.grid.cols} (see `main.py gui --size`).")
+            return
 
+        self.reset_all()
+        self.grid.cells[:] = trace.cells
+        self.grid.costs[:] = trace.costs
+        self.grid.touch()
+        self.start_cell, self.end_cell = trace.start, trace.end
+        self.paint_grid()
+        self.was_run = True
+        self.replay = TracePlayer(trace, self.cells, self.canvas, self.resting_color, on_move=self._replay_moved)
+        if self.replay_slider:
+            self.replay_slider.configure(from_=0, to=max(len(trace), 1), number_of_steps=max(len(trace), 1))
+        self._replay_moved(0)
+        if self.result_label:
+            self.result_label.configure(text=f"Trace: {trace.algorithm}, {len(trace)} events")
+
+    def toggle_replay(self):
+        if self.replay is None:
+            self.open_trace()
+            return
+        if self.replay.playing:
+            self.replay.pause()
         else:
-            # none existed: pick both
-            if len(open_cells) < 2:
-                messagebox.showerror("Error", "No empty cells for start and end.")
-                return
-            self.start_cell = random.choice(open_cells)
-            self.end_cell = random.choice([cell for cell in open_cells if cell != self.start_cell])
+            self.replay.play(float(self.replay_speed.get().rstrip("x")))
+        self._replay_moved(self.replay.position)
 
-        # if by any chance both equal, re-pick end
-        if self.start_cell == self.end_cell:
-            fallback = [cell for cell in open_cells if cell != self.start_cell]
-            if fallback:
-                self.end_cell = random.choice(fallback)
+    def replay_seek(self, position):
+        if self.replay is not None and int(float(position)) != self.replay.position:
+            self.replay.pause()
+            self.replay.seek(int(float(position)))
 
-        # color start/end
-        sr, sc = self.start_cell
-        er, ec = self.end_cell
-        self.canvas.itemconfig(self.rectangles[sr][sc], fill=START_COLOR)
-        self.canvas.itemconfig(self.rectangles[er][ec], fill=END_COLOR)
+    def stop_replay(self):
+        """Drop the open trace (closing its file); its colors stay until the next reset."""
+        if self.replay is None:
+            return
+        self.replay.pause()
+        self.replay.trace.close()
+        self.replay = None
+        if self.replay_slider:
+            self.replay_slider.set(0)
+        self._replay_moved(0)
+
+    def _replay_moved(self, position):
+        replay = self.replay
+        if self.replay_btn:
+            self.replay_btn.configure(text="Pause Replay" if replay and replay.playing else "Play Trace")
+        if self.replay_slider and replay:
+            self.replay_slider.set(position)
+        if self.replay_label:
+            if replay is None:
+                self.replay_label.configure(text="No trace open")
+            else:
+                shown = replay.trace.time(position - 1) if position else 0.0
+                self.replay_label.configure(text=f"{position}/{len(replay.trace)} events, {format_seconds(shown)}")
+
+    def compare_in_workers(self, algos, profile=None, on_done=None):
+        """Solve `algos` headlessly in worker processes and rank them by compute time.
+
+        Returns at once; the window polls the workers from the Tk event loop
+        and calls on_done(cheapest) with the cheapest (algorithm, cost), or
+        None, when all have finished. With "Replay traces" on, each trace is
+        stored in the solve cache (so its button replays it instantly) and
+        the fastest one is painted. A reset while the workers run drops
+        their results, and on_done is not called.
+        """
+        if self.was_run:
+            self.reset_algorithm_visuals()
+        # the reset re-enables the algorithm buttons; keep them locked while the pool runs
+        self._lock_run()
+        self.stop_requested = False
+        self.is_running = True
+        self.run_token += 1
+        token = self.run_token
+        move_mode = self.move_mode.get()
+        from maze.parallel import start_parallel  # the process pool machinery is only needed here
 
-        self.canvas.update()
-        self.generated_maze = True
+        pool, futures = start_parallel(self.grid, self.start_cell, self.end_cell, algos, move_mode,
+                                       record=self.replay_compare.get(), profile=self._profiler(profile))
 
-    def compare_all(self):
+        def collect(algo, future):
+            # a worker that raised (or a pool that broke) counts as a run without a result
+            try:
+                return future.result()
+            except Exception:
+                return algo, None, 0.0, None, None
+
+        def poll():
+            if self.stop_requested or self.run_token != token:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._unlock_run()
+                if hasattr(self, "pause_btn"):
+                    self.pause_btn.configure(state="normal")
+                return
+            if not all(future.done() for future in futures):
+                self.canvas.after(COMPARE_POLL_MS, poll)
+                return
+            pool.shutdown()
+            self.is_running = False
+            cheapest = None
+            try:
+                cheapest = self._rank_runs([collect(algo, future) for algo, future in zip(algos, futures)], move_mode)
+            finally:
+                if on_done:
+                    on_done(cheapest)
+                else:
+                    self._unlock_run()
+                    if hasattr(self, "pause_btn"):
+                        self.pause_btn.configure(state="normal")
+
+        self.canvas.after(COMPARE_POLL_MS, poll)
+
+    def _rank_runs(self, runs, move_mode):
+        """Cache, rank and show the (algo, result, seconds, events, times) runs of a parallel comparison."""
+        cheapest = None
+        shown = None
+        for algo, result, seconds, events, times in runs:
+            if result is None:
+                continue
+            run_time = seconds
+            cost = path_cost(self.grid, result.path)
+            if events is not None:
+                key = self.solve_cache.key(self.grid, self.start_cell, self.end_cell, move_mode, algo, instrument=False)
+                self.solve_cache.put(key, ((result.visited, result.path_length), run_time, events, times, None),
+                                     weight=1 + len(events))
+            if self.best_time is None or run_time < self.best_time:
+                self.best_time = run_time
+                self.fastest_algo = algo
+                shown = (result, run_time, cost, events, times)
+            if cheapest is None or cost < cheapest[1]:
+                cheapest = (algo, cost)
+
+        if shown is None:
+            return None
+        result, run_time, cost, events, times = shown
+        self.visited_label.configure(text=f"Visited: {result.visited}")
+        if self.grid.weighted:
+            self.path_label.configure(text=f"Path length: {result.path_length} (cost {cost})")
+        else:
+            self.path_label.configure(text=f"Path length: {result.path_length}")
+        self.time_label.configure(text=self._time_text(None, run_time))
+        self.best_label.configure(text=f"Best: {self.fastest_algo} ({format_seconds(self.best_time)})")
+        if events is not None:
+            paint_events(events, self.cells, self.canvas)
+            self.keep_trace(self.fastest_algo, events, times)
+            self.was_run = True
+        return cheapest
+
+    def compare_all(self, profile=None):
+        """Run every applicable algorithm; `profile` is passed to each run_search() (or worker)."""
         # guard: cannot compare if something is running or paused
         if self.is_running or self.paused:
             messagebox.showinfo("Info", "Cannot compare while an algorithm is running or paused.")
@@ -671,15 +848,7 @@ class MazeGUI:
             return
 
         # lock UI
-        try:
-            if hasattr(self, "move_toggle"):
-                self.move_toggle.configure(state="disabled")
-            for algo in self.algorithm_buttons.values():
-                algo.configure(state="disabled")
-            if hasattr(self, "pause_btn"):
-                self.pause_btn.configure(state="disabled")
-        except Exception:
-            pass
+        self._lock_run()
 
         # reset "best" just for this comparison
         self.best_time = None
@@ -690,27 +859,52 @@ class MazeGUI:
             self.result_label.configure(text="Result: Comparing all...")
 
         # which algorithms to run
-        algos = ["BFS", "Bi BFS", "DFS", "A*"]
-        # include JPS only when valid (4-dir and generated maze)
-        if self.move_mode.get() == "4" and self.generated_maze:
-            algos.append("JPS")
+        algos = ["BFS", "Bi BFS", "DFS", "A*", "Bi A*", "Dijkstra", "JPS"]
+
+        if self.parallel_compare.get():
+            self.compare_in_workers(algos, profile, on_done=self._compare_done)
+            return
 
-        # run each algorithm
+        # run each algorithm in turn; each run_search() starts the next when it ends
+        # a reset (e.g. Generate Maze) leaves stop_requested set; it must not end the comparison before it starts
+        self.stop_requested = False
         prev_delay = self.delay_value.get()
         self.delay_value.set(min(prev_delay, 0))  # for faster visualization
+        remaining = iter(algos)
+        cheapest = None
+        current = None
+
+        token = None
+
+        def run_next():
+            nonlocal cheapest, current, token
+            if current is not None and self.run_token != token:
+                # a run started by hand replaced ours: leave the canvas to it
+                self.delay_value.set(prev_delay)
+                if hasattr(self, "pause_btn"):
+                    self.pause_btn.configure(state="normal")
+                return
+            if current is not None and self.last_cost is not None and (cheapest is None or self.last_cost < cheapest[1]):
+                cheapest = (current, self.last_cost)
+            current = None if self.stop_requested else next(remaining, None)  # stop ends the comparison
+            if current is None:
+                self.delay_value.set(prev_delay)
+                self._compare_done(cheapest)
+                return
+            token = self.run_token + 1
+            self.run_search(current, profile, on_done=run_next)
 
-        for key in algos:
-            self.run_search(key)
-            if self.stop_requested:
-                break  # in case a stop was triggered mid-way
-
-        self.delay_value.set(prev_delay)
+        run_next()
 
+    def _compare_done(self, cheapest):
         # summary UI
         if self.fastest_algo:
             self.highlight_button(self.fastest_algo)
             if self.result_label:
-                self.result_label.configure(text=f"Result: Best is {self.fastest_algo}")
+                summary = f"Result: Best is {self.fastest_algo}"
+                if cheapest and self.grid.weighted:
+                    summary += f"\nCheapest path: {cheapest[0]} (cost {cheapest[1]})"
+                self.result_label.configure(text=summary)
         else:
             if self.result_label:
                 self.result_label.configure(text="Result: Comparison finished")
@@ -726,8 +920,13 @@ class MazeGUI:
         except Exception:
             pass
 
+def fit_cell_size(rows, cols):
+    """CELL_SIZE, or the largest cell size (at least 1 pixel) that keeps the canvas within MAX_CANVAS."""
+    return max(1, min(CELL_SIZE, MAX_CANVAS // max(rows, cols)))
+
 
-def show_gui():
+def show_gui(rows=GRID_ROWS, cols=GRID_COLS, cell_size=None, renderer=None):
+    """Build the window; `renderer` is "rectangles", "bitmap" or None to pick by grid size (see maze.cells)."""
     root = ttk.Window(themename="morph")
     root.title("Maze Visualizer")
     my_font = ctk.CTkFont(family="Arial", size=15, weight="bold", slant="italic")
@@ -757,6 +956,8 @@ def show_gui():
     time_label.pack(padx=(0, 5), anchor = "w")
     best_label = ctk.CTkLabel(stats_frame, text="Best: N/A", text_color="#7A7A7A", font=my_font)
     best_label.pack(padx=(0, 5), anchor = "w")
+    counters_label = ctk.CTkLabel(stats_frame, text="", text_color="#7A7A7A", font=ctk.CTkFont(family="Arial", size=12), justify="left")
+    counters_label.pack(padx=(0, 5), anchor = "w")
 
 
     # ===== Legend =====
@@ -796,6 +997,7 @@ def show_gui():
     add_legend_color(col_left, START_COLOR, "Start")
     add_legend_color(col_left, END_COLOR, "End")
     add_legend_color(col_left, WALL_COLOR, "Wall")
+    add_legend_color(col_left, MUD_COLOR, "Mud (cost 5)")
 
     # right column: Path / Search
     add_legend_color(col_right, PATH_COLOR, "Final Path")
@@ -808,6 +1010,7 @@ def show_gui():
     1. Right-click to set start (green) 
         and end (red) points
     2. Left-click to draw/erase walls
+        (or mud with the Mud brush)
     3. Use 'Create Maze' to generate a 
         random maze
     4. Select an algorithm to run
@@ -853,9 +1056,13 @@ def show_gui():
     algorithm_descriptions = {
         "BFS": "Breadth-First Search: Explores all neighbors at the current depth before going deeper. Guarantees shortest path.",
         "Bi BFS": "Bidirectional BFS: Runs two simultaneous BFS searches — one from start, one from end — and stops when they meet. Faster in many cases.",
+        "Bi A*": "Bidirectional A*: Runs A* from both ends, each aimed at the other, and always grows the smaller frontier. Stops once no shorter path can remain, so the path is still the shortest.",
         "DFS": "Depth-First Search: Explores as far as possible along each branch before backtracking. Not guaranteed to find the shortest path.",
         "A*": "A* Search: Uses heuristics to guide the search. Guarantees shortest path and is usually fast.",
-        "JPS": "Jump Point Search: Optimized for uniform-cost grids. Skips unnecessary nodes and accelerates A* search. Best with open mazes.",
+        "JPS": "Jump Point Search: Optimized for uniform-cost grids. Skips unnecessary nodes and accelerates A* search. Works in both 4- and 8-direction modes; best with open mazes.",
+        "Dijkstra": "Dijkstra: Finds the cheapest path when cells have different costs (paint mud with the Mud brush; mud costs 5 to cross). Uses a radix heap for its queue.",
+        "HPA*": "Hierarchical A*: Splits the grid into 16x16 clusters joined at entrances, searches that small graph, then fills in the path cluster by cluster. Built for very large maps; paths are close to, but not always, the shortest.",
+        "LPA*": "Lifelong Planning A*: Keeps its search between runs. After you edit walls, it repairs only the affected part of the search instead of starting over.",
     }
 
     def create_algo_button(name, algo_key):
@@ -895,6 +1102,10 @@ def show_gui():
     create_algo_button("Run DFS (3)", "DFS")
     create_algo_button("Run A* (4)", "A*")
     create_algo_button("Run JumpPoint Search (5)", "JPS")
+    create_algo_button("Run LPA* (6)", "LPA*")
+    create_algo_button("Run Bidirectional A* (7)", "Bi A*")
+    create_algo_button("Run Dijkstra (8)", "Dijkstra")
+    create_algo_button("Run HPA* (9)", "HPA*")
 
     ctk.CTkButton(
         control_frame,
@@ -909,7 +1120,51 @@ def show_gui():
     ).pack(pady=(20, 10))
 
 
-    gui = MazeGUI(canvas_frame, visited_label, path_label, time_label, best_label, algorithm_buttons=algorithm_buttons, result_label=result_label)
+    gui = MazeGUI(canvas_frame, visited_label, path_label, time_label, best_label, algorithm_buttons=algorithm_buttons, result_label=result_label,
+                  rows=rows, cols=cols, cell_size=cell_size or fit_cell_size(rows, cols), renderer=renderer)
+
+    ctk.CTkCheckBox(
+        control_frame,
+        text="Compare in parallel",
+        font=my_font,
+        variable=gui.parallel_compare,
+    ).pack(anchor="w", padx=20)
+    ctk.CTkCheckBox(
+        control_frame,
+        text="Replay traces",
+        font=my_font,
+        variable=gui.replay_compare,
+    ).pack(anchor="w", padx=20, pady=(4, 0))
+    ctk.CTkCheckBox(
+        control_frame,
+        text="Instrument runs",
+        font=my_font,
+        variable=gui.instrument,
+    ).pack(anchor="w", padx=20, pady=(4, 0))
+    ctk.CTkCheckBox(
+        control_frame,
+        text="Profile runs (p)",
+        font=my_font,
+        variable=gui.profile_runs,
+    ).pack(anchor="w", padx=20, pady=(4, 0))
+    gui.counters_label = counters_label
+
+    # ===== Trace replay bar under the canvas =====
+    replay_frame = tk.Frame(canvas_frame, bg=BACKGROUND_COLOR)
+    replay_frame.pack(fill=tk.X, pady=(6, 0))
+    ctk.CTkButton(replay_frame, text="Open Trace", width=100, command=lambda: gui.open_trace()).pack(side=tk.LEFT, padx=(0, 5))
+    ctk.CTkButton(replay_frame, text="Save Trace", width=100, command=lambda: gui.save_last_trace()).pack(side=tk.LEFT, padx=5)
+    replay_btn = ctk.CTkButton(replay_frame, text="Play Trace", width=110, command=lambda: gui.toggle_replay())
+    replay_btn.pack(side=tk.LEFT, padx=5)
+    ctk.CTkOptionMenu(replay_frame, values=list(REPLAY_SPEEDS), variable=gui.replay_speed, width=80).pack(side=tk.LEFT, padx=5)
+    replay_slider = ctk.CTkSlider(replay_frame, from_=0, to=1, command=gui.replay_seek)
+    replay_slider.set(0)
+    replay_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+    replay_label = ctk.CTkLabel(replay_frame, text="No trace open", text_color="#7A7A7A")
+    replay_label.pack(side=tk.LEFT, padx=5)
+    gui.replay_btn = replay_btn
+    gui.replay_slider = replay_slider
+    gui.replay_label = replay_label
 
     ttk.Label(control_frame, text="Movement", font=header_font).pack(pady=(10, 6))
     move_toggle = ctk.CTkSegmentedButton(
@@ -920,6 +1175,13 @@ def show_gui():
     move_toggle.pack(pady=(0, 10))
     gui.move_toggle = move_toggle
 
+    ttk.Label(control_frame, text="Brush", font=header_font).pack(pady=(10, 6))
+    ctk.CTkSegmentedButton(
+        control_frame,
+        values=["Wall", "Mud"],
+        variable=gui.brush
+    ).pack(pady=(0, 10))
+
 
     pause_btn = ctk.CTkButton(
         control_frame,
@@ -978,12 +1240,8 @@ def show_gui():
     def on_close():
         try:
             gui.stop_requested = True
+            gui.stop_animation()
             gui.paused = False
-            if hasattr(gui, "_pause_end"):
-                try:
-                    gui._pause_end()
-                except Exception:
-                    pass
             try:
                 gui.canvas.update()
             except Exception:
@@ -1026,12 +1284,19 @@ def show_gui():
         # Ctrl+R: Full Reset
         root.bind_all("<Control-KeyPress-r>", call_async(gui.reset_all))
 
-        # 1..5: run algos
+        # 1..9: run algos
         root.bind_all("<KeyPress-1>", lambda e: (root.after(0, lambda: run_algo("BFS")), "break")[1])
         root.bind_all("<KeyPress-2>", lambda e: (root.after(0, lambda: run_algo("Bi BFS")), "break")[1])
         root.bind_all("<KeyPress-3>", lambda e: (root.after(0, lambda: run_algo("DFS")), "break")[1])
         root.bind_all("<KeyPress-4>", lambda e: (root.after(0, lambda: run_algo("A*")), "break")[1])
         root.bind_all("<KeyPress-5>", lambda e: (root.after(0, lambda: run_algo("JPS")), "break")[1])
+        root.bind_all("<KeyPress-6>", lambda e: (root.after(0, lambda: run_algo("LPA*")), "break")[1])
+        root.bind_all("<KeyPress-7>", lambda e: (root.after(0, lambda: run_algo("Bi A*")), "break")[1])
+        root.bind_all("<KeyPress-8>", lambda e: (root.after(0, lambda: run_algo("Dijkstra")), "break")[1])
+        root.bind_all("<KeyPress-9>", lambda e: (root.after(0, lambda: run_algo("HPA*")), "break")[1])
+
+        # P: toggle per-run profiling
+        root.bind_all("<KeyPress-p>", call_async(gui.toggle_profiling))
 
         # C: Compare All 
         root.bind_all("<KeyPress-c>", lambda e: (root.after(0, gui.compare_all) if not (gui.is_running or gui.paused) else None, "break")[1])
@@ -0,0 +1,327 @@
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+from maze.events import VISIT, PUSH, PATH, SearchResult
+from maze.graph import derived_for, flat_index, padded_node
+from maze.utils import DIRS_4, manhattan_distance
+
+
+class HierarchicalMap:
+    """HPA* abstraction of a grid: square clusters linked through entrances.
+
+    Where two neighboring clusters touch, the open cell pairs that cross
+    the border are grouped into runs, and each run gets one entrance (a
+    cell on either side). Inside a cluster, the distances between its
+    entrances are found once by a BFS limited to the cluster. A query then
+    only searches the small graph of entrances and expands that path back
+    into cells, one cluster-sized segment at a time. Segments are memoized,
+    so repeated long queries on a big map cost little beyond the endpoint
+    clusters. After wall edits, update_cells() rebuilds only the clusters
+    that were touched and their neighbors. Paths are near-optimal, not
+    guaranteed shortest.
+
+    Nodes are flat indexes into a wall-padded grid, as in maze.graph;
+    owner[i] is the cluster of open node i and -1 for walls and padding.
+    """
+
+    def __init__(self, grid, dirs=DIRS_4, cluster_size=16):
+        rows, cols = len(grid), len(grid[0])
+        width = cols + 2
+        self.grid = grid
+        self.rows, self.cols, self.width = rows, cols, width
+        self.dirs = tuple(dirs)
+        self.deltas = tuple(dr * width + dc for dr, dc in dirs)
+        self.size = cluster_size
+        self.cluster_rows = -(-rows // cluster_size)
+        self.cluster_cols = -(-cols // cluster_size)
+        count = self.cluster_rows * self.cluster_cols
+
+        self.owner = array("i", [-1]) * ((rows + 2) * width)
+        for r in range(rows):
+            row = grid[r]
+            for c in range(cols):
+                if row[c] == 0:
+                    self.owner[(r + 1) * width + c + 1] = r // cluster_size * self.cluster_cols + c // cluster_size
+
+        self.entrances = [set() for _ in range(count)]
+        self.links = {}       # entrance -> entrances one step away in neighboring clusters
+        self.intra = {}       # entrance -> {entrance: distance} inside its own cluster
+        self.crossings = {}   # (cluster, cluster) -> [(a, b), ...] entrance pairs on that border
+        self.segments = [{} for _ in range(count)]
+        self.version = getattr(grid, "version", None)
+
+        for k in range(count):
+            for other in self._neighbors(k):
+                if other > k:
+                    self._build_border(k, other)
+        for k in range(count):
+            self._build_intra(k)
+
+    # ----- layout -----
+    def node(self, r, c):
+        return (r + 1) * self.width + c + 1
+
+    def cluster_of(self, i):
+        r, c = divmod(i, self.width)
+        return (r - 1) // self.size * self.cluster_cols + (c - 1) // self.size
+
+    def _box(self, k):
+        cr, cc = divmod(k, self.cluster_cols)
+        r0, c0 = cr * self.size, cc * self.size
+        return r0, min(r0 + self.size, self.rows), c0, min(c0 + self.size, self.cols)
+
+    def _neighbors(self, k):
+        cr, cc = divmod(k, self.cluster_cols)
+        found = []
+        for dr, dc in self.dirs:
+            r, c = cr + dr, cc + dc
+            if 0 <= r < self.cluster_rows and 0 <= c < self.cluster_cols:
+                found.append(r * self.cluster_cols + c)
+        return found
+
+    # ----- building -----
+    def _border_edges(self, k, other):
+        """Open cell pairs (a in k, b in other) one move apart."""
+        r0, r1, c0, c1 = self._box(k)
+        owner, width = self.owner, self.width
+        perimeter = set()
+        for r in range(r0, r1):
+            perimeter.add((r + 1) * width + c0 + 1)
+            perimeter.add((r + 1) * width + c1)
+        for c in range(c0, c1):
+            perimeter.add((r0 + 1) * width + c + 1)
+            perimeter.add(r1 * width + c + 1)
+        edges = []
+        for a in sorted(perimeter):
+            if owner[a] == k:
+                for d in self.deltas:
+                    if owner[a + d] == other:
+                        edges.append((a, a + d))
+        return edges
+
+    def _build_border(self, k, other):
+        """Pick one entrance pair per run of crossings between clusters k and other."""
+        edges = self._border_edges(k, other)
+        width = self.width
+        straight = {d for d, (dr, dc) in zip(self.deltas, self.dirs) if not (dr and dc)}
+
+        def touching(x, y):
+            return x == y or abs(x - y) == 1 or abs(x - y) == width
+
+        # two crossings are in one run when their inside cells and their outside
+        # cells are each equal or side by side; every run is then connected on both sides
+        group = list(range(len(edges)))
+
+        def find(e):
+            while group[e] != e:
+                group[e] = group[group[e]]
+                e = group[e]
+            return e
+
+        by_cell = {}
+        for e, (a, b) in enumerate(edges):
+            by_cell.setdefault(a, []).append(e)
+        for e, (a, b) in enumerate(edges):
+            for near in (a, a - 1, a - width):
+                for f in by_cell.get(near, ()):
+                    if f != e and touching(b, edges[f][1]):
+                        group[find(e)] = find(f)
+
+        runs = {}
+        for e in range(len(edges)):
+            runs.setdefault(find(e), []).append(edges[e])
+        chosen = []
+        for run in runs.values():
+            options = [edge for edge in run if edge[1] - edge[0] in straight] or run
+            chosen.append(options[len(options) // 2])
+
+        for a, b in chosen:
+            self.entrances[k].add(a)
+            self.entrances[other].add(b)
+            self.links.setdefault(a, set()).add(b)
+            self.links.setdefault(b, set()).add(a)
+        self.crossings[(k, other)] = chosen
+
+    def _drop_border(self, k, other):
+        for a, b in self.crossings.pop((k, other), ()):
+            for x, y, cluster in ((a, b, k), (b, a, other)):
+                partners = self.links.get(x)
+                if partners is not None:
+                    partners.discard(y)
+                    if not partners:
+                        del self.links[x]
+                        self.entrances[cluster].discard(x)
+                        self.intra.pop(x, None)
+
+    def _search_cluster(self, k, source, goals=None):
+        """BFS from source inside cluster k; returns (distances, parents) as dicts."""
+        owner, deltas = self.owner, self.deltas
+        dist = {source: 0}
+        parents = {}
+        queue = deque([source])
+        # stop early once every goal is reached; -1 never counts down to zero
+        remaining = len(goals) - (source in goals) if goals is not None else -1
+        while queue and remaining:
+            i = queue.popleft()
+            step = dist[i] + 1
+            for d in deltas:
+                j = i + d
+                if owner[j] == k and j not in dist:
+                    dist[j] = step
+                    parents[j] = i
+                    queue.append(j)
+                    if goals is not None and j in goals:
+                        remaining -= 1
+        return dist, parents
+
+    def _build_intra(self, k):
+        entrances = self.entrances[k]
+        for u in entrances:
+            dist, _ = self._search_cluster(k, u, entrances)
+            self.intra[u] = {v: dist[v] for v in entrances if v != u and v in dist}
+        self.segments[k] = {}
+
+    def update_cells(self, indexes):
+        """Re-read edited cells (flat r * cols + c indexes) and rebuild the clusters they touch."""
+        cols, grid = self.cols, self.grid
+        touched = set()
+        for index in indexes:
+            r, c = divmod(index, cols)
+            u = padded_node(index, cols)
+            k = self.cluster_of(u)
+            self.owner[u] = k if grid[r][c] == 0 else -1
+            touched.add(k)
+
+        rebuilt = set(touched)
+        borders = set()
+        for k in touched:
+            for other in self._neighbors(k):
+                borders.add((min(k, other), max(k, other)))
+                rebuilt.add(other)
+        for pair in borders:
+            self._drop_border(*pair)
+            self._build_border(*pair)
+        for k in rebuilt:
+            self._build_intra(k)
+        self.version = getattr(grid, "version", None)
+
+    # ----- queries -----
+    def _attach(self, node):
+        """Temporary edges from a query endpoint to the entrances of its cluster."""
+        k = self.cluster_of(node)
+        dist, parents = self._search_cluster(k, node)
+        edges = {v: dist[v] for v in self.entrances[k] if v != node and v in dist}
+        return k, dist, parents, edges
+
+    def search(self, start, end, heuristic=manhattan_distance):
+        """Step-event generator over the abstract graph.
+
+        Returns (abstract nodes expanded, entrance-level path), or None.
+        """
+        source, target = self.node(*start), self.node(*end)
+        source_cluster, source_dist, source_parents, out_edges = self._attach(source)
+        target_cluster, target_dist, target_parents, in_edges = self._attach(target)
+        self._endpoints = (source, source_parents, target, target_parents)
+        goal = divmod(target, self.width)
+        width, cols, intra, links = self.width, self.cols, self.intra, self.links
+
+        def neighbors(u):
+            if u == source:
+                yield from out_edges.items()
+                if source_cluster == target_cluster and target in source_dist:
+                    yield target, source_dist[target]
+            else:
+                yield from intra.get(u, {}).items()
+            for v in links.get(u, ()):
+                yield v, 1
+            if u in in_edges:
+                yield target, in_edges[u]
+
+        g = {source: 0}
+        parents = {}
+        closed = set()
+        # ties on f go to the deeper node, as in bidirectional_a_star_steps
+        open_set = [(heuristic(divmod(source, width), goal), 0, source)]
+        while open_set:
+            _, cost, u = heappop(open_set)
+            cost = -cost
+            if u in closed:
+                continue
+            closed.add(u)
+            yield VISIT, flat_index(u, width)
+            if u == target:
+                path = [u]
+                while u != source:
+                    u = parents[u]
+                    path.append(u)
+                path.reverse()
+                return len(closed), path
+            for v, step in neighbors(u):
+                new_cost = cost + step
+                if v not in closed and new_cost < g.get(v, new_cost + 1):
+                    g[v] = new_cost
+                    parents[v] = u
+                    heappush(open_set, (new_cost + heuristic(divmod(v, width), goal), -new_cost, v))
+                    yield PUSH, flat_index(v, width)
+        return None
+
+    def refine(self, nodes):
+        """Yield the (r, c) cells of the abstract path found by search(), one segment at a time."""
+        source, source_parents, target, target_parents = self._endpoints
+        width = self.width
+
+        def cell(i):
+            r, c = divmod(i, width)
+            return r - 1, c - 1
+
+        yield cell(nodes[0])
+        for u, v in zip(nodes, nodes[1:]):
+            if v in self.links.get(u, ()):
+                yield cell(v)
+                continue
+            if u == source:
+                steps = _walk_back(source_parents, v, source)
+            elif v == target:
+                steps = _walk_back(target_parents, u, target)[::-1][1:] + [target]
+            else:
+                memo = self.segments[self.cluster_of(u)]
+                steps = memo.get((u, v))
+                if steps is None:
+                    _, parents = self._search_cluster(self.cluster_of(u), u, {v})
+                    steps = memo[(u, v)] = _walk_back(parents, v, u)
+            for i in steps:
+                yield cell(i)
+
+
+def _walk_back(parents, end, root):
+    """Nodes after root up to end, following a BFS parents dict."""
+    steps = []
+    i = end
+    while i != root:
+        steps.append(i)
+        i = parents[i]
+    steps.reverse()
+    return steps
+
+
+def hierarchy_for(grid, dirs=DIRS_4):
+    """Return the grid's HierarchicalMap for this move mode, rebuilding only clusters edited since."""
+    return derived_for(grid, ("hpa", tuple(dirs)), lambda: HierarchicalMap(grid, dirs))
+
+
+def hpa_steps(grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance):
+    """HPA* query: abstract search events, then the refined path."""
+    if start == end:
+        return SearchResult(1, [start])
+    hierarchy = hierarchy_for(grid, dirs)
+    found = yield from hierarchy.search(start, end, heuristic)
+    if found is None:
+        return None
+    expanded, nodes = found
+    cols = hierarchy.cols
+    path = []
+    for r, c in hierarchy.refine(nodes):
+        path.append((r, c))
+        yield PATH, r * cols + c
+    return SearchResult(expanded, path)
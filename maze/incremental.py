@@ -0,0 +1,165 @@
+from array import array
+from heapq import heappush, heappop
+
+from maze.events import VISIT, PUSH, PATH, SearchResult
+from maze.graph import derived_for, flat_index, pad_cells, padded_node
+from maze.utils import DIRS_4, manhattan_distance
+
+INF = 2 ** 30
+
+
+class LPAStar:
+    """Lifelong Planning A* between a fixed start and end.
+
+    g/rhs values and the open queue survive between runs. After walls
+    change, update_cells() re-queues only the edited cells and their
+    neighbors, and the next compute() repairs the affected region instead of
+    searching from scratch. Nodes are flat indexes into a wall-padded grid,
+    as in maze.graph.
+    """
+
+    def __init__(self, grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance):
+        self.grid = grid
+        self.rows, self.cols = len(grid), len(grid[0])
+        width = self.cols + 2
+        self.width = width
+        self.size = (self.rows + 2) * width
+        self.start, self.end = start, end
+        self.dirs = tuple(dirs)
+        self.deltas = tuple(dr * width + dc for dr, dc in dirs)
+        self.heuristic = heuristic
+
+        self.passable = pad_cells(grid)
+
+        self.source = (start[0] + 1) * width + start[1] + 1
+        self.target = (end[0] + 1) * width + end[1] + 1
+        self.goal = divmod(self.target, width)
+
+        self.g = array("i", [INF]) * self.size
+        self.rhs = array("i", [INF]) * self.size
+        self.rhs[self.source] = 0
+        self.open = []
+        self.queued = {}
+        self.version = getattr(grid, "version", None)
+        self._update_vertex(self.source)
+
+    def _key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        return (m + self.heuristic(divmod(u, self.width), self.goal), m)
+
+    def _update_vertex(self, u):
+        g, rhs, passable = self.g, self.rhs, self.passable
+        if u != self.source:
+            best = INF
+            if passable[u]:
+                for d in self.deltas:
+                    v = u + d
+                    if passable[v] and g[v] < best:
+                        best = g[v]
+                best = min(best + 1, INF)
+            rhs[u] = best
+        if g[u] != rhs[u]:
+            key = self._key(u)
+            self.queued[u] = key
+            heappush(self.open, (key[0], key[1], u))
+            return True
+        self.queued.pop(u, None)
+        return False
+
+    def _top(self):
+        open_set, queued = self.open, self.queued
+        while open_set:
+            k1, k2, u = open_set[0]
+            if queued.get(u) == (k1, k2):
+                return open_set[0]
+            heappop(open_set)
+        return None
+
+    def update_cells(self, indexes):
+        """Re-read the given flat cell indexes (r * cols + c) from the grid and queue the repairs."""
+        cols, cells = self.cols, self.grid
+        touched = set()
+        for index in indexes:
+            r, c = divmod(index, cols)
+            u = padded_node(index, cols)
+            self.passable[u] = 1 if cells[r][c] == 0 else 0
+            touched.add(u)
+            touched.update(u + d for d in self.deltas)
+        for u in touched:
+            self._update_vertex(u)
+        self.version = getattr(self.grid, "version", None)
+
+    def steps(self, counters=None):
+        """Step-event generator that repairs g-values until the end's are consistent.
+
+        With `counters`, counters["neighbors"] tallies the neighbors each
+        expansion re-examines.
+        """
+        g, rhs, queued, target = self.g, self.rhs, self.queued, self.target
+        width, cols = self.width, self.cols
+        expanded = 0
+        if counters is not None:
+            counters.setdefault("neighbors", 0)
+
+        while True:
+            top = self._top()
+            if top is None or ((top[0], top[1]) >= self._key(target) and rhs[target] == g[target]):
+                break
+            heappop(self.open)
+            u = top[2]
+            del queued[u]
+            expanded += 1
+
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+            pushed = [v for v in (u + d for d in self.deltas) if self.passable[v] and self._update_vertex(v)]
+            if counters is not None:
+                counters["neighbors"] += len(self.deltas)
+
+            # the planner outlives the run, so only yield between whole vertex updates:
+            # a run closed early must leave g, rhs and the queue consistent
+            yield VISIT, flat_index(u, width)
+            for v in pushed:
+                yield PUSH, flat_index(v, width)
+
+        path = self.path()
+        if path is None:
+            return None
+        for r, c in path:
+            yield PATH, r * cols + c
+        return SearchResult(expanded, path)
+
+    def path(self):
+        """Greedy descent over g from end to start, or None if end is unreachable."""
+        g, passable, width = self.g, self.passable, self.width
+        u = self.target
+        if g[u] >= INF:
+            return None
+        path = [self.end]
+        while u != self.source:
+            u = min((u + d for d in self.deltas if passable[u + d]), key=g.__getitem__)
+            r, c = divmod(u, width)
+            path.append((r - 1, c - 1))
+        path.reverse()
+        return path
+
+
+def planner_for(grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance):
+    """Return the LPAStar kept for this grid and query, brought up to date with the grid's edits."""
+    derived = getattr(grid, "derived", None)
+
+    def build():
+        # one planner per grid; a new query replaces the old state
+        for old in [k for k in derived or () if k[0] == "lpa"]:
+            del derived[old]
+        return LPAStar(grid, start, end, dirs, heuristic)
+
+    return derived_for(grid, ("lpa", start, end, tuple(dirs), heuristic), build)
+
+
+def lpa_star_steps(grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance, counters=None):
+    """Solver-registry entry: reuse the grid's planner and yield only the repair work."""
+    return (yield from planner_for(grid, start, end, dirs, heuristic).steps(counters))
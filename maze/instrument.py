@@ -0,0 +1,130 @@
+import inspect
+import tracemalloc
+from contextlib import contextmanager
+
+from maze.components import reachable
+from maze.events import VISIT, PUSH, PUSH_BACK
+from maze.solvers import SOLVERS, run_steps
+from maze.utils import DIRS_4, manhattan_distance
+
+# open-set counters from SearchResult.stats, renamed so they don't clash with the event tallies
+QUEUE_COUNTERS = {
+    "pushes": "heap_pushes",
+    "decreases": "heap_decreases",
+    "pops": "heap_pops",
+    "stale": "stale_pops",
+    "peak": "heap_peak",
+}
+
+
+def solver_options(algorithm, counters):
+    """Keyword options that let `algorithm` tally its internal work (e.g. JPS jump probes) into counters."""
+    if "counters" in inspect.signature(SOLVERS[algorithm]).parameters:
+        return {"counters": counters}
+    return {}
+
+
+def count_steps(steps, counters):
+    """Pass a solver's step events through unchanged while tallying them into `counters`.
+
+    Counts come from the event stream, so solvers pay nothing unless they
+    are wrapped:
+      popped        nodes expanded (VISIT events)
+      reopened      expansions of a node that was already expanded
+      pushes        frontier insertions, both directions of a bidirectional search
+      peak_open     most cells pushed but not yet expanded at once
+      peak_closed   distinct cells expanded
+    Solvers given `counters` through solver_options() add their own tallies,
+    such as "neighbors" (neighbors examined per expansion) and JPS's
+    "jump_probes". When the run ends, open-set counters from the result's
+    stats are added under the names in QUEUE_COUNTERS. Returns the solver's result.
+    """
+    closed = set()
+    frontier = set()
+    popped = reopened = pushes = peak_open = 0
+
+    advance = steps.__next__
+    while True:
+        try:
+            event = advance()
+        except StopIteration as done:
+            result = done.value
+            break
+        kind, index = event
+        if kind == VISIT:
+            popped += 1
+            if index in closed:
+                reopened += 1
+            else:
+                closed.add(index)
+            frontier.discard(index)
+        elif kind == PUSH or kind == PUSH_BACK:
+            pushes += 1
+            frontier.add(index)
+            if len(frontier) > peak_open:
+                peak_open = len(frontier)
+        yield event
+
+    counters.update(popped=popped, reopened=reopened, pushes=pushes, peak_open=peak_open, peak_closed=len(closed))
+    if result is not None:
+        for key, name in QUEUE_COUNTERS.items():
+            if key in result.stats:
+                counters[name] = result.stats[key]
+    return result
+
+
+@contextmanager
+def peak_memory(counters):
+    """Store the tracemalloc high-water mark of the block in counters["peak_memory"] (bytes)."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    try:
+        yield counters
+        counters["peak_memory"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def instrumented_solve(algorithm, grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance, memory=True, **options):
+    """solve() with search counters: returns (SearchResult or None, counters).
+
+    Always runs the step-event solver (the event-free Wavefront / Bitset BFS
+    versions have nothing to count). With memory=True, counters["peak_memory"]
+    is the tracemalloc high-water mark of the run in bytes; tracing slows the
+    run down, so leave it off when timing.
+    """
+    counters = {}
+    if not reachable(grid, start, end, dirs):
+        return None, counters
+    steps = SOLVERS[algorithm](grid, start, end, dirs, heuristic, **options, **solver_options(algorithm, counters))
+    steps = count_steps(steps, counters)
+
+    if memory:
+        with peak_memory(counters):
+            result = run_steps(steps)
+    else:
+        result = run_steps(steps)
+    return result, counters
+
+
+def format_counters(counters):
+    """Short multi-line summary for the stats panel."""
+    if not counters:
+        return ""
+    lines = [
+        f"Popped: {counters.get('popped', 0)}  Reopened: {counters.get('reopened', 0)}",
+        f"Neighbors examined: {counters.get('neighbors', 'n/a')}",
+        f"Pushes: {counters.get('pushes', 0)}  Peak open: {counters.get('peak_open', 0)}",
+        f"Peak closed: {counters.get('peak_closed', 0)}",
+    ]
+    if "heap_pushes" in counters:
+        lines.append(f"Heap pushes: {counters['heap_pushes']}  Stale pops: {counters.get('stale_pops', 0)}")
+    if "jump_probes" in counters:
+        lines.append(f"Jump probes: {counters['jump_probes']}")
+    if "peak_memory" in counters:
+        lines.append(f"Peak memory: {counters['peak_memory'] / 2 ** 20:.2f} MiB")
+    return "\n".join(lines)
@@ -0,0 +1,216 @@
+from array import array
+
+from maze.graph import derived_for, pad_cells, padded_node
+from maze.utils import DIRS_4, DIRS_8
+
+
+class JumpTable:
+    """JPS+ jump distances for every cell and direction, built once per maze.
+
+    For direction k, tables[k][i] tells what a JPS jump from node i finds
+    when the goal is ignored:
+      p > 0   the next jump point is p steps away;
+      -n <= 0 there is no jump point; n open cells follow, then a wall.
+    A query only adds the goal check, which is a little arithmetic on the
+    same numbers, so a jump costs O(1) instead of a scan. Nodes use the
+    wall-padded flat layout of maze.graph. Values are int16 when the grid
+    allows it. When walls change, update_cells() recomputes only the
+    straight lines through the edit and the diagonal runs that lead into it.
+    With 4 directions a vertical jump stops wherever a horizontal one would,
+    so the vertical tables are read off the horizontal ones, as the
+    diagonal tables are with 8.
+    """
+
+    def __init__(self, grid, dirs=DIRS_4):
+        rows, cols = len(grid), len(grid[0])
+        width = cols + 2
+        self.grid = grid
+        self.rows, self.cols, self.width = rows, cols, width
+        self.size = (rows + 2) * width
+        self.eight = len(dirs) == 8
+        self.dirs = DIRS_8 if self.eight else DIRS_4
+        self.deltas = tuple(dr * width + dc for dr, dc in self.dirs)
+        # horizontal tables first: 4-direction vertical tables depend on them
+        self.straight = sorted((k for k, (dr, dc) in enumerate(self.dirs) if not (dr and dc)),
+                               key=lambda k: self.dirs[k][0] != 0)
+        self.diagonal = [k for k, (dr, dc) in enumerate(self.dirs) if dr and dc]
+
+        self.passable = pad_cells(grid)
+
+        typecode = "h" if max(rows, cols) < 2 ** 15 - 1 else "i"
+        self.tables = [array(typecode, bytes(array(typecode).itemsize * self.size)) for _ in self.dirs]
+        self.version = getattr(grid, "version", None)
+
+        for k in self.straight:
+            for line in self._lines(k, range(1, rows + 1), range(1, cols + 1)):
+                self._scan_line(k, line)
+        for k in self.diagonal:
+            dr, dc = self.dirs[k]
+            row_order = range(rows, 0, -1) if dr > 0 else range(1, rows + 1)
+            col_order = range(cols, 0, -1) if dc > 0 else range(1, cols + 1)
+            self._scan_line(k, [r * width + c for r in row_order for c in col_order])
+
+    def _lines(self, k, rows, cols):
+        """Straight lines for direction k, each ordered so a cell follows the one it depends on."""
+        dr, dc = self.dirs[k]
+        width = self.width
+        if dr == 0:
+            col_order = sorted(cols, reverse=dc > 0)
+            return [[r * width + c for c in col_order] for r in rows]
+        row_order = sorted(rows, reverse=dr > 0)
+        return [[r * width + c for r in row_order] for c in cols]
+
+    def _stopper(self, k):
+        """stops(y): would a goal-less jump moving in direction k stop at node y?"""
+        P, width = self.passable, self.width
+        dr, dc = self.dirs[k]
+        if dr and dc:
+            vertical = self.tables[self.dirs.index((dr, 0))]
+            horizontal = self.tables[self.dirs.index((0, dc))]
+            ahead = dr * width
+
+            def stops(y):
+                if (P[y + ahead - dc] and not P[y - dc]) or (P[y - ahead + dc] and not P[y - ahead]):
+                    return True
+                return vertical[y] > 0 or horizontal[y] > 0
+        elif self.eight and dr == 0:
+            def stops(y):
+                return (P[y + width + dc] and not P[y + width]) or (P[y - width + dc] and not P[y - width])
+        elif self.eight:
+            ahead = dr * width
+
+            def stops(y):
+                return (P[y + ahead + 1] and not P[y + 1]) or (P[y + ahead - 1] and not P[y - 1])
+        elif dr == 0:
+            def stops(y):
+                return (P[y + width] and not P[y + width - dc]) or (P[y - width] and not P[y - width - dc])
+        else:
+            left, right = self.tables[self.dirs.index((0, -1))], self.tables[self.dirs.index((0, 1))]
+
+            def stops(y):
+                return left[y] > 0 or right[y] > 0
+        return stops
+
+    def _scan_line(self, k, line):
+        """Recompute direction k along `line`; returns the nodes whose value changed."""
+        table, delta, P, stops = self.tables[k], self.deltas[k], self.passable, self._stopper(k)
+        changed = []
+        for x in line:
+            y = x + delta
+            if not P[y]:
+                v = 0
+            elif stops(y):
+                v = 1
+            else:
+                v = table[y]
+                v = v + 1 if v > 0 else v - 1
+            if table[x] != v:
+                table[x] = v
+                changed.append(x)
+        return changed
+
+    def update_cells(self, indexes):
+        """Re-read edited cells (flat r * cols + c indexes) from the grid and patch the tables."""
+        cols, width, grid = self.cols, self.width, self.grid
+        edited = set()
+        rows_hit, cols_hit = set(), set()
+        for index in indexes:
+            r, c = divmod(index, cols)
+            u = padded_node(index, cols)
+            self.passable[u] = 1 if grid[r][c] == 0 else 0
+            edited.add(u)
+            rows_hit.update(rr for rr in (r, r + 1, r + 2) if 1 <= rr <= self.rows)
+            cols_hit.update(cc for cc in (c, c + 1, c + 2) if 1 <= cc <= self.cols)
+
+        seeds = set()
+        all_rows, all_cols = range(1, self.rows + 1), range(1, self.cols + 1)
+        for k in self.straight:
+            if self.dirs[k][0] == 0:
+                lines = self._lines(k, rows_hit, all_cols)
+            else:
+                if not self.eight:
+                    # vertical values follow the horizontal ones changed so far
+                    cols_hit.update(x % width for x in seeds)
+                lines = self._lines(k, all_rows, cols_hit)
+            for line in lines:
+                seeds.update(self._scan_line(k, line))
+
+        if self.diagonal:
+            for u in edited:
+                r, c = divmod(u, width)
+                seeds.update(rr * width + cc for rr in (r - 1, r, r + 1) for cc in (c - 1, c, c + 1)
+                             if 1 <= rr <= self.rows and 1 <= cc <= self.cols)
+            rows, cols = self.rows, self.cols
+            for k in self.diagonal:
+                dr, dc = self.dirs[k]
+                delta = self.deltas[k]
+                # a cell's value depends on the next cell along the diagonal, so seeds
+                # further along go first; then walk back while values keep changing
+                for y in sorted(seeds, key=lambda y: (y // width) * dr + (y % width) * dc, reverse=True):
+                    x = y - delta
+                    while 1 <= x // width <= rows and 1 <= x % width <= cols and self._scan_line(k, (x,)):
+                        x -= delta
+        self.version = getattr(grid, "version", None)
+
+    def jumper(self, end):
+        """A jump(r, c, dr, dc) function for the JPS search loops, aimed at `end`."""
+        width, tables, index, eight = self.width, self.tables, {d: k for k, d in enumerate(self.dirs)}, self.eight
+        er, ec = end
+
+        def reach(k, i):
+            v = tables[k][i]
+            return v if v > 0 else -v
+
+        def jump(r, c, dr, dc):
+            k = index[(dr, dc)]
+            i = (r + 1) * width + c + 1
+            v = tables[k][i]
+            n = v if v > 0 else -v
+            gr, gc = er - r, ec - c
+            if dr == 0:
+                if gr == 0 and gc * dc > 0 and abs(gc) <= n:
+                    return end
+            elif dc == 0:
+                if gr * dr > 0 and abs(gr) <= n:
+                    if gc == 0:
+                        return end
+                    # a 4-direction vertical jump also stops on the goal's row when a horizontal one reaches it
+                    if not eight and abs(gc) <= reach(index[(0, 1 if gc > 0 else -1)], i + gr * width):
+                        return (er, c)
+            elif gr * dr > 0 and gc * dc > 0:
+                steps = min(abs(gr), abs(gc))
+                if steps <= n:
+                    if abs(gr) == abs(gc):
+                        return end
+                    y = i + steps * (dr * width + dc)
+                    if abs(gr) > abs(gc):
+                        if abs(gr) - steps <= reach(index[(dr, 0)], y):
+                            return (r + steps * dr, c + steps * dc)
+                    elif abs(gc) - steps <= reach(index[(0, dc)], y):
+                        return (r + steps * dr, c + steps * dc)
+            if v > 0:
+                return (r + v * dr, c + v * dc)
+            return None
+
+        return jump
+
+    def walk(self, r, c):
+        return self.passable[(r + 1) * self.width + c + 1]
+
+
+def jump_table_for(grid, dirs=DIRS_4):
+    """Return the grid's JumpTable for this move mode, patched with any edits since it was built."""
+    return derived_for(grid, ("jps+", len(dirs)), lambda: JumpTable(grid, dirs))
+
+
+def jps_plus_steps(grid, start, end, dirs=DIRS_4, heuristic=None, open_set="heap", counters=None):
+    """JPS+ query: the JPS search loops with table lookups in place of jump scans."""
+    from maze.solvers import jps4_search, jps8_search  # maze.solvers registers this module
+    from maze.queues import make_open_set
+
+    table = jump_table_for(grid, dirs)
+    jump = table.jumper(end)
+    queue = make_open_set(open_set, table.rows * table.cols)
+    if table.eight:
+        return (yield from jps8_search(start, end, table.cols, jump, table.walk, queue, counters))
+    return (yield from jps4_search(start, end, table.cols, jump, queue, counters))
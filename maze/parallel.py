@@ -0,0 +1,60 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from time import perf_counter
+
+from maze.events import record_events
+from maze.graph import graph_for
+from maze.profiling import profiled
+from maze.solvers import SOLVERS, solve
+from maze.utils import movement
+
+
+def timed_solve(algorithm, grid, start, end, move_mode="4", record=False, profile=None):
+    """One headless run: (algorithm, SearchResult or None, compute seconds, events, times).
+
+    The time covers solve() alone; the grid's graph is built beforehand,
+    as every graph search shares it. With record=True a found path is run a
+    second time, untimed, to collect its event log and event timestamps
+    for replay; otherwise events and times are None. `profile`
+    ("pstats" or "collapsed") writes a profile of the timed solve.
+    """
+    dirs, heuristic = movement(str(move_mode))
+    graph_for(grid, dirs)
+    with profiled(algorithm, profile) if profile else nullcontext():
+        began = perf_counter()
+        result = solve(algorithm, grid, start, end, dirs, heuristic)
+        seconds = perf_counter() - began
+    events = times = None
+    if record and result is not None:
+        steps = SOLVERS[algorithm](grid, start, end, dirs, heuristic)
+        times = array("Q")
+        _, events = record_events(steps, start, end, len(grid[0]), times)
+    return algorithm, result, seconds, events, times
+
+
+def start_parallel(grid, start, end, algorithms, move_mode="4", record=False, max_workers=None, profile=None):
+    """Submit timed_solve() for every algorithm to a new process pool without waiting.
+
+    Returns (pool, futures in `algorithms` order); the caller collects the
+    futures and shuts the pool down. compare_parallel() is the blocking form.
+    """
+    workers = min(len(algorithms), max_workers or os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    futures = [pool.submit(timed_solve, algorithm, grid, start, end, move_mode, record, profile)
+               for algorithm in algorithms]
+    return pool, futures
+
+
+def compare_parallel(grid, start, end, algorithms, move_mode="4", record=False, max_workers=None, profile=None):
+    """Run timed_solve() for every algorithm in its own worker process.
+
+    Results come back in `algorithms` order. Each worker gets a pickled
+    copy of the grid (derived structures are rebuilt there), so with
+    enough cores the wall time is about that of the slowest algorithm
+    plus the pool start-up, not the sum of all runs.
+    """
+    pool, futures = start_parallel(grid, start, end, algorithms, move_mode, record, max_workers, profile)
+    with pool:
+        return [future.result() for future in futures]
@@ -0,0 +1,97 @@
+import cProfile
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_DIR = "profiles"
+PROFILERS = ("pstats", "collapsed")
+
+_run_numbers = itertools.count(1)
+
+
+class StackSampler:
+    """Sampling profiler for one thread, written as collapsed stacks.
+
+    A daemon thread reads the target thread's current frame every
+    `interval` seconds and counts the call stack it sees. Time spent in
+    C calls such as canvas.update() or time.sleep() shows up under the
+    Python function that made the call, which cProfile's per-function
+    totals tend to spread thin. The output is one "outer;...;inner count"
+    line per stack, the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval=0.001, thread=None):
+        self.interval = interval
+        self.thread_id = (thread or threading.current_thread()).ident
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def _sample(self):
+        frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frame = frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._sample, name="stack-sampler", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        self._worker.join()
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profile_path(label, profiler="pstats", directory=PROFILE_DIR):
+    """A fresh file name for one run: <directory>/<time>-<n>-<label>.prof or .collapsed."""
+    slug = re.sub(r"[^a-z0-9]+", "-", label.replace("*", "star").lower()).strip("-") or "run"
+    suffix = ".prof" if profiler == "pstats" else ".collapsed"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"{stamp}-{next(_run_numbers):03d}-{slug}{suffix}")
+
+
+@contextmanager
+def profiled(label, profiler="pstats", directory=PROFILE_DIR):
+    """Profile the block and write it to a file named after `label`; yields that path.
+
+    profiler="pstats" runs cProfile and dumps pstats data (open it with
+    `python -m pstats` or snakeviz); "collapsed" runs StackSampler. The file
+    is written even when the block raises or is cut short.
+    """
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {profiler}")
+    os.makedirs(directory, exist_ok=True)
+    path = profile_path(label, profiler, directory)
+    if profiler == "pstats":
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield path
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+    else:
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield path
+        finally:
+            sampler.stop()
+            sampler.dump(path)
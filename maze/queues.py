@@ -0,0 +1,265 @@
+from array import array
+from heapq import heappush, heappop
+
+
+class HeapQueue:
+    """heapq open set with lazy deletion.
+
+    An improved priority is pushed as a new entry; the old one stays in the
+    heap and is skipped when it surfaces. Cheap per operation, but the heap
+    can hold many more entries than live items.
+
+    All open sets share one interface over integer items below `size`:
+    push(item, priority, tiebreak) inserts an item or lowers its priority,
+    pop() returns (priority, item) of a live item with the smallest
+    (priority, tiebreak, item), and stats() reports the work done
+    (stale counts superseded entries that pop() skipped).
+    """
+
+    def __init__(self, size):
+        self.heap = []
+        # priority of each open item; an entry is stale once its item's priority dropped
+        # below it or the item was popped, so only open items take space
+        self.current = {}
+        self.pushes = self.pops = self.decreases = self.peak = self.stale = 0
+
+    def __len__(self):
+        return len(self.current)
+
+    def push(self, item, priority, tiebreak=0):
+        current = self.current
+        if item in current:
+            self.decreases += 1
+        current[item] = priority
+        heappush(self.heap, (priority, tiebreak, item))
+        self.pushes += 1
+
+    def pop(self):
+        heap, current = self.heap, self.current
+        # the heap only grows between pops, so its peak is seen here
+        if len(heap) > self.peak:
+            self.peak = len(heap)
+        while heap:
+            priority, _, item = heappop(heap)
+            if current.get(item) == priority:
+                del current[item]
+                self.pops += 1
+                return priority, item
+            self.stale += 1
+        raise IndexError("pop from an empty open set")
+
+    def stats(self):
+        """pushes counts every insert or decrease; peak is the most entries held at once."""
+        return {"pushes": self.pushes, "decreases": self.decreases, "pops": self.pops, "stale": self.stale,
+                "peak": self.peak}
+
+
+class IndexedHeap(HeapQueue):
+    """Binary heap with decrease-key: one entry per item, so it never outgrows the live set.
+
+    pos[item] is the item's slot in the heap (-1 when absent); lowering a
+    priority rewrites the entry in place and sifts it up.
+    """
+
+    def __init__(self, size):
+        self.heap = []
+        self.pos = array("i", [-1]) * size
+        self.pushes = self.pops = self.decreases = self.peak = self.stale = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, item, priority, tiebreak=0):
+        entry = (priority, tiebreak, item)
+        slot = self.pos[item]
+        if slot < 0:
+            slot = len(self.heap)
+            self.heap.append(entry)
+            self.pushes += 1
+            if len(self.heap) > self.peak:
+                self.peak = len(self.heap)
+        else:
+            self.heap[slot] = entry
+            self.decreases += 1
+        self._sift_up(slot)
+
+    def pop(self):
+        heap, pos = self.heap, self.pos
+        if not heap:
+            raise IndexError("pop from an empty open set")
+        top = heap[0]
+        last = heap.pop()
+        pos[top[2]] = -1
+        if heap:
+            heap[0] = last
+            pos[last[2]] = 0
+            self._sift_down(0)
+        self.pops += 1
+        return top[0], top[2]
+
+    def _sift_up(self, slot):
+        heap, pos = self.heap, self.pos
+        entry = heap[slot]
+        while slot:
+            parent = (slot - 1) >> 1
+            above = heap[parent]
+            if not entry < above:
+                break
+            heap[slot] = above
+            pos[above[2]] = slot
+            slot = parent
+        heap[slot] = entry
+        pos[entry[2]] = slot
+
+    def _sift_down(self, slot):
+        heap, pos = self.heap, self.pos
+        count = len(heap)
+        entry = heap[slot]
+        while True:
+            child = 2 * slot + 1
+            if child >= count:
+                break
+            if child + 1 < count and heap[child + 1] < heap[child]:
+                child += 1
+            below = heap[child]
+            if not below < entry:
+                break
+            heap[slot] = below
+            pos[below[2]] = slot
+            slot = child
+        heap[slot] = entry
+        pos[entry[2]] = slot
+
+
+class BucketQueue(HeapQueue):
+    """Dial's bucket queue for small non-negative integer priorities.
+
+    buckets[p] is a stack of items pushed with priority p, and the cursor
+    only moves forward while the popped priorities do (as A*'s f does with
+    a consistent heuristic), so push and pop are O(1) amortized. Ties
+    within a bucket pop last-in first-out; the tiebreak is ignored.
+    Superseded entries are skipped lazily, as in HeapQueue.
+    """
+
+    def __init__(self, size):
+        self.buckets = []
+        self.cursor = 0
+        self.live = 0
+        self.entries = 0
+        self.pushes = self.pops = self.decreases = self.peak = self.stale = 0
+        self.priority = array("i", [-1]) * size
+
+    def __len__(self):
+        return self.live
+
+    def push(self, item, priority, tiebreak=0):
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        if self.priority[item] < 0:
+            self.live += 1
+        else:
+            self.decreases += 1
+        self.priority[item] = priority
+        buckets[priority].append(item)
+        if priority < self.cursor:
+            self.cursor = priority
+        self.pushes += 1
+        self.entries += 1
+        if self.entries > self.peak:
+            self.peak = self.entries
+
+    def pop(self):
+        buckets, current = self.buckets, self.priority
+        while self.cursor < len(buckets):
+            bucket = buckets[self.cursor]
+            while bucket:
+                item = bucket.pop()
+                self.entries -= 1
+                if current[item] == self.cursor:
+                    current[item] = -1
+                    self.live -= 1
+                    self.pops += 1
+                    return self.cursor, item
+                self.stale += 1
+            self.cursor += 1
+        raise IndexError("pop from an empty open set")
+
+
+class RadixHeap(HeapQueue):
+    """Monotone radix heap for integer priorities that never drop below the last pop.
+
+    That holds for Dijkstra's distances and for A*'s f with a consistent
+    heuristic. An entry with priority p sits in bucket (p ^ last).bit_length(),
+    where last is the most recently popped priority. When bucket 0 runs dry,
+    the lowest non-empty bucket is redistributed around its minimum, and
+    every entry only ever moves to a lower bucket, so a pop costs O(log C)
+    amortized for priorities up to C, however many distinct values there
+    are. The tiebreak is ignored; superseded entries are skipped lazily.
+    """
+
+    def __init__(self, size):
+        # one bucket per possible bit length of a 64-bit priority, plus bucket 0
+        self.buckets = [[] for _ in range(65)]
+        self.last = 0
+        self.live = 0
+        self.entries = 0
+        self.pushes = self.pops = self.decreases = self.peak = self.stale = 0
+        self.priority = array("q", [-1]) * size
+
+    def __len__(self):
+        return self.live
+
+    def push(self, item, priority, tiebreak=0):
+        if priority < self.last:
+            raise ValueError("radix heap priorities must not drop below the last popped one")
+        if self.priority[item] < 0:
+            self.live += 1
+        else:
+            self.decreases += 1
+        self.priority[item] = priority
+        self.buckets[(priority ^ self.last).bit_length()].append((priority, item))
+        self.pushes += 1
+        self.entries += 1
+        if self.entries > self.peak:
+            self.peak = self.entries
+
+    def pop(self):
+        buckets, current = self.buckets, self.priority
+        ready = buckets[0]
+        while True:
+            while ready:
+                priority, item = ready.pop()
+                self.entries -= 1
+                if current[item] == priority:
+                    current[item] = -1
+                    self.live -= 1
+                    self.pops += 1
+                    return priority, item
+                self.stale += 1
+            for slot in range(1, 65):
+                if buckets[slot]:
+                    break
+            else:
+                raise IndexError("pop from an empty open set")
+            spill = buckets[slot]
+            buckets[slot] = []
+            last = self.last = min(spill)[0]
+            for entry in spill:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+
+
+OPEN_SETS = {
+    "heap": HeapQueue,
+    "indexed": IndexedHeap,
+    "bucket": BucketQueue,
+    "radix": RadixHeap,
+}
+
+
+def make_open_set(kind, size):
+    """Build the open set named `kind` for items 0 .. size - 1."""
+    try:
+        return OPEN_SETS[kind](size)
+    except KeyError:
+        raise ValueError(f"Unknown open set: {kind}") from None
@@ -0,0 +1,615 @@
+import inspect
+from array import array
+from heapq import heappush, heappop
+from collections import deque
+
+from maze.events import VISIT, PUSH, PUSH_BACK, PATH, SearchResult
+from maze.graph import graph_for
+from maze.utils import DIRS_4, DIRS_8, manhattan_distance, chebyshev_distance
+from maze.wavefront import wavefront_steps, wavefront_bfs
+from maze.bitset import bitset_steps, bitset_bfs
+from maze.incremental import lpa_star_steps
+from maze.jps_plus import jps_plus_steps
+from maze.queues import make_open_set
+from maze.weighted import dijkstra_steps
+from maze.hpa import hpa_steps
+from maze.components import reachable
+
+_UNSEEN = 2 ** 31 - 1
+
+
+def reconstruct_path(parents, start, end):
+    """Walk parents back from end, filling in straight jumps (JPS) cell by cell."""
+    def line_between(a, b):
+        r1, c1 = a
+        r2, c2 = b
+        dr = (r2 - r1)
+        dc = (c2 - c1)
+        if dr:
+            dr //= abs(dr)
+        if dc:
+            dc //= abs(dc)
+        cells = []
+        r, c = r1 + dr, c1 + dc
+        while (r, c) != b:
+            cells.append((r, c))
+            r += dr
+            c += dc
+        return cells
+
+    curr = end
+    path_cells = []
+    while curr in parents:
+        prev = parents[curr]
+        path_cells.append(curr)
+        if max(abs(curr[0] - prev[0]), abs(curr[1] - prev[1])) > 1:
+            path_cells.extend(reversed(line_between(prev, curr)))
+        curr = prev
+    path_cells.append(start)
+    path_cells.reverse()
+    return path_cells
+
+
+def _emit_path(path, cols):
+    for r, c in path:
+        yield PATH, r * cols + c
+
+
+def _start_tally(counters):
+    """Instrumented runs (see maze.instrument) tally the neighbors each expansion examines."""
+    if counters is not None:
+        counters.setdefault("neighbors", 0)
+
+
+def bfs_steps(grid, start, end, dirs=DIRS_4, heuristic=None, counters=None):
+    graph = graph_for(grid, dirs)
+    offsets, targets, index = graph.offsets, graph.targets, graph.index
+    source, target = graph.node(*start), graph.node(*end)
+    _start_tally(counters)
+
+    queue = deque([source])
+    visited = bytearray(graph.size)
+    visited[source] = 1
+    visited_count = 1
+    parents = array("i", [-1]) * graph.size
+
+    while queue:
+        i = queue.popleft()
+        yield VISIT, index(i)
+        if i == target:
+            path = graph.trace(parents, source, target)
+            yield from _emit_path(path, graph.cols)
+            return SearchResult(visited_count, path)
+
+        if counters is not None:
+            counters["neighbors"] += offsets[i + 1] - offsets[i]
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if not visited[j]:
+                visited[j] = 1
+                visited_count += 1
+                queue.append(j)
+                parents[j] = i
+                yield PUSH, index(j)
+
+    return None
+
+
+def a_star_steps(grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance, open_set="heap", counters=None):
+    graph = graph_for(grid, dirs)
+    offsets, targets, index, width = graph.offsets, graph.targets, graph.index, graph.width
+    source, target = graph.node(*start), graph.node(*end)
+    _start_tally(counters)
+    goal = divmod(target, width)  # padded (r, c); heuristics only use differences
+
+    queue = make_open_set(open_set, graph.size)
+    push, pop = queue.push, queue.pop
+    push(source, heuristic(start, end), 0)
+
+    parents = array("i", [-1]) * graph.size
+    g_score = array("i", [_UNSEEN]) * graph.size
+    g_score[source] = 0
+    visited = bytearray(graph.size)
+    visited_count = 0
+
+    while queue:
+        _, i = pop()
+        if i == target:
+            path = graph.trace(parents, source, target)
+            yield from _emit_path(path, graph.cols)
+            return SearchResult(visited_count, path, queue.stats())
+
+        if visited[i]:
+            continue
+        visited[i] = 1
+        visited_count += 1
+
+        yield VISIT, index(i)
+        if counters is not None:
+            counters["neighbors"] += offsets[i + 1] - offsets[i]
+        tentative_g = g_score[i] + 1
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if tentative_g < g_score[j]:
+                g_score[j] = tentative_g
+                push(j, tentative_g + heuristic(divmod(j, width), goal), tentative_g)
+                parents[j] = i
+                yield PUSH, index(j)
+
+    return None
+
+
+def bidirectional_bfs_steps(grid, start, end, dirs=DIRS_4, heuristic=None, counters=None):
+    if start == end:
+        return SearchResult(1, [start])
+
+    graph = graph_for(grid, dirs)
+    offsets, targets, index = graph.offsets, graph.targets, graph.index
+    source, target = graph.node(*start), graph.node(*end)
+    _start_tally(counters)
+
+    queue_start = deque([source])
+    queue_end = deque([target])
+
+    visited_start = bytearray(graph.size)
+    visited_end = bytearray(graph.size)
+    visited_start[source] = 1
+    visited_end[target] = 1
+
+    parents_start = array("i", [-1]) * graph.size
+    parents_end = array("i", [-1]) * graph.size
+    discovered = 1
+
+    meeting_point = None
+
+    while queue_start and queue_end:
+        i = queue_start.popleft()
+        yield VISIT, index(i)
+        if visited_end[i]:
+            meeting_point = i
+            break
+
+        if counters is not None:
+            counters["neighbors"] += offsets[i + 1] - offsets[i]
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if not visited_start[j]:
+                visited_start[j] = 1
+                discovered += 1
+                queue_start.append(j)
+                parents_start[j] = i
+                yield PUSH, index(j)
+
+        i = queue_end.popleft()
+        yield VISIT, index(i)
+        if visited_start[i]:
+            meeting_point = i
+            break
+
+        if counters is not None:
+            counters["neighbors"] += offsets[i + 1] - offsets[i]
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if not visited_end[j]:
+                visited_end[j] = 1
+                discovered += 1
+                queue_end.append(j)
+                parents_end[j] = i
+                yield PUSH_BACK, index(j)
+
+    if meeting_point is None:
+        return None
+
+    path = graph.trace(parents_start, source, meeting_point)
+    i = meeting_point
+    while i != target:
+        i = parents_end[i]
+        path.append(graph.cell(i))
+
+    yield from _emit_path(path, graph.cols)
+    return SearchResult(discovered, path)
+
+
+def bidirectional_a_star_steps(grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance, smaller_frontier=True,
+                               counters=None):
+    """Front-to-end bidirectional A*: one A* from start toward end, one from end toward start.
+
+    `best` is the cheapest start-end path seen where the two searches touch.
+    With a consistent heuristic no shorter path is left once either side's
+    smallest open f reaches it, so the search stops there. Ties on f go to
+    the deeper node, which sends both sides straight at each other on open
+    maps. With smaller_frontier the side with fewer open nodes is expanded
+    next; otherwise the sides alternate.
+
+    Front-to-end bounds stay loose until one side's f reaches `best`, so both
+    searches usually run well past the meeting point: on 8-direction maps with
+    obstacles this often expands more nodes than plain A*. It pays off mostly
+    in corridor mazes.
+    """
+    if start == end:
+        return SearchResult(1, [start])
+
+    graph = graph_for(grid, dirs)
+    offsets, targets, index, width = graph.offsets, graph.targets, graph.index, graph.width
+    source, target = graph.node(*start), graph.node(*end)
+    _start_tally(counters)
+
+    goals = (divmod(target, width), divmod(source, width))
+    g_scores = (array("i", [_UNSEEN]) * graph.size, array("i", [_UNSEEN]) * graph.size)
+    parents = (array("i", [-1]) * graph.size, array("i", [-1]) * graph.size)
+    closed = (bytearray(graph.size), bytearray(graph.size))
+    open_sets = ([(heuristic(start, end), 0, source)], [(heuristic(end, start), 0, target)])
+    open_counts = [1, 1]
+    g_scores[0][source] = 0
+    g_scores[1][target] = 0
+    push_events = (PUSH, PUSH_BACK)
+
+    best, meeting_point = _UNSEEN, -1
+    expanded = 0
+    side = 1
+
+    while True:
+        # drop entries for closed nodes and superseded scores
+        for heap, g_score, done in zip(open_sets, g_scores, closed):
+            while heap and (done[heap[0][2]] or -heap[0][1] != g_score[heap[0][2]]):
+                heappop(heap)
+        if not open_sets[0] or not open_sets[1]:
+            break
+        if max(open_sets[0][0][0], open_sets[1][0][0]) >= best:
+            break
+
+        if smaller_frontier:
+            side = 0 if open_counts[0] <= open_counts[1] else 1
+        else:
+            side = 1 - side
+        heap, g_score, parent, done = open_sets[side], g_scores[side], parents[side], closed[side]
+        other_g, goal, event = g_scores[1 - side], goals[side], push_events[side]
+
+        _, _, i = heappop(heap)
+        done[i] = 1
+        open_counts[side] -= 1
+        expanded += 1
+        yield VISIT, index(i)
+
+        if counters is not None:
+            counters["neighbors"] += offsets[i + 1] - offsets[i]
+        tentative_g = g_score[i] + 1
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if tentative_g < g_score[j]:
+                if g_score[j] == _UNSEEN:
+                    open_counts[side] += 1
+                g_score[j] = tentative_g
+                parent[j] = i
+                heappush(heap, (tentative_g + heuristic(divmod(j, width), goal), -tentative_g, j))
+                yield event, index(j)
+                if other_g[j] != _UNSEEN and tentative_g + other_g[j] < best:
+                    best, meeting_point = tentative_g + other_g[j], j
+
+    if meeting_point < 0:
+        return None
+
+    path = graph.trace(parents[0], source, meeting_point)
+    i = meeting_point
+    while i != target:
+        i = parents[1][i]
+        path.append(graph.cell(i))
+
+    yield from _emit_path(path, graph.cols)
+    return SearchResult(expanded, path)
+
+
+def dfs_steps(grid, start, end, dirs=DIRS_4, heuristic=None, counters=None):
+    graph = graph_for(grid, dirs)
+    offsets, targets, index = graph.offsets, graph.targets, graph.index
+    source, target = graph.node(*start), graph.node(*end)
+    _start_tally(counters)
+
+    stack = [source]
+    visited = bytearray(graph.size)
+    visited[source] = 1
+    visited_count = 1
+    parents = array("i", [-1]) * graph.size
+
+    while stack:
+        i = stack.pop()
+        yield VISIT, index(i)
+        if i == target:
+            path = graph.trace(parents, source, target)
+            yield from _emit_path(path, graph.cols)
+            return SearchResult(visited_count, path)
+
+        if counters is not None:
+            counters["neighbors"] += offsets[i + 1] - offsets[i]
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            if not visited[j]:
+                parents[j] = i
+
+                # early exit on discovery of the goal
+                if j == target:
+                    path = graph.trace(parents, source, target)
+                    yield from _emit_path(path, graph.cols)
+                    # +1 to count the end as visited (optional)
+                    return SearchResult(visited_count + 1, path)
+
+                visited[j] = 1
+                visited_count += 1
+                stack.append(j)
+                yield PUSH, index(j)
+
+    return None
+
+
+def _counting(probe, counters, key="jump_probes"):
+    """Wrap a cell test so each call is tallied in counters[key]; used only by instrumented runs."""
+    counters.setdefault(key, 0)
+
+    def counted(r, c):
+        counters[key] += 1
+        return probe(r, c)
+    return counted
+
+
+def jps_steps(grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance, open_set="heap", counters=None):
+    """Jump Point Search; pass a `counters` dict to tally the cells read by jump scans."""
+    if len(dirs) == 8:
+        return (yield from _jps8_steps(grid, start, end, open_set, counters))
+
+    rows, cols = len(grid), len(grid[0])
+
+    def is_open(r, c):
+        return 0 <= r < rows and 0 <= c < cols and grid[r][c] == 0
+
+    if counters is not None:
+        is_open = _counting(is_open, counters)
+
+    # horizontal runs stop where a cell above or below opens up past a blocked one;
+    # vertical runs stop wherever a horizontal run from the cell would stop, so
+    # every turn of a shortest path lands on a jump point
+    def jump_across(r, c, dc):
+        while True:
+            c += dc
+            if not is_open(r, c):
+                return None
+            if (r, c) == end:
+                return (r, c)
+            if (is_open(r - 1, c) and not is_open(r - 1, c - dc)) or (is_open(r + 1, c) and not is_open(r + 1, c - dc)):
+                return (r, c)
+
+    def jump(r, c, dr, dc):
+        if dr == 0:
+            return jump_across(r, c, dc)
+        while True:
+            r += dr
+            if not is_open(r, c):
+                return None
+            if (r, c) == end or jump_across(r, c, 1) or jump_across(r, c, -1):
+                return (r, c)
+
+    return (yield from jps4_search(start, end, cols, jump, make_open_set(open_set, rows * cols), counters))
+
+
+def jps4_search(start, end, cols, jump, queue, counters=None):
+    """A* over 4-direction jump points; `jump(r, c, dr, dc)` returns the next one or None.
+
+    `queue` is an empty open set from maze.queues, keyed by r * cols + c.
+    With `counters`, each direction jumped from an expanded point counts as
+    one neighbor examined.
+    """
+    _start_tally(counters)
+    visited = set()
+    g_cost = {start: 0}
+    parents = {}
+
+    queue.push(start[0] * cols + start[1], manhattan_distance(start, end))
+
+    while queue:
+        r, c = divmod(queue.pop()[1], cols)
+
+        if (r, c) in visited:
+            continue
+        visited.add((r, c))
+        yield VISIT, r * cols + c
+
+        if (r, c) == end:
+            path = reconstruct_path(parents, start, end)
+            yield from _emit_path(path, cols)
+            return SearchResult(len(visited), path, queue.stats())
+
+        if counters is not None:
+            counters["neighbors"] += 4
+        for dr, dc in DIRS_4:
+            jp = jump(r, c, dr, dc)
+            if jp and jp not in visited:
+                new_cost = g_cost[(r, c)] + manhattan_distance((r, c), jp)
+                if jp not in g_cost or new_cost < g_cost[jp]:
+                    g_cost[jp] = new_cost
+                    queue.push(jp[0] * cols + jp[1], new_cost + manhattan_distance(jp, end))
+                    parents[jp] = (r, c)
+                    yield PUSH, jp[0] * cols + jp[1]
+
+    return None
+
+
+def _sign(v):
+    return (v > 0) - (v < 0)
+
+
+def _jps8_steps(grid, start, end, open_set="heap", counters=None):
+    """8-connected Jump Point Search with the same move rules as DIRS_8.
+
+    Diagonal steps only need the target cell open (as in bfs/a_star), and
+    every move costs 1, so g-costs and the heuristic use chebyshev_distance.
+    Forced-neighbor rules follow Harabor & Grastien for always-allowed
+    diagonals; walls come from the graph's padded passable map, so no
+    bounds checks are needed.
+    """
+    graph = graph_for(grid, DIRS_8)
+    passable, width, cols = graph.passable, graph.width, graph.cols
+    er, ec = end
+
+    def walk(r, c):
+        return passable[(r + 1) * width + c + 1]
+
+    scan = walk if counters is None else _counting(walk, counters)
+
+    def jump_straight(r, c, dr, dc):
+        while True:
+            r += dr
+            c += dc
+            if not scan(r, c):
+                return None
+            if r == er and c == ec:
+                return (r, c)
+            if dr == 0:
+                if (scan(r + 1, c + dc) and not scan(r + 1, c)) or (scan(r - 1, c + dc) and not scan(r - 1, c)):
+                    return (r, c)
+            else:
+                if (scan(r + dr, c + 1) and not scan(r, c + 1)) or (scan(r + dr, c - 1) and not scan(r, c - 1)):
+                    return (r, c)
+
+    def jump(r, c, dr, dc):
+        if dr == 0 or dc == 0:
+            return jump_straight(r, c, dr, dc)
+        while True:
+            r += dr
+            c += dc
+            if not scan(r, c):
+                return None
+            if r == er and c == ec:
+                return (r, c)
+            if (scan(r + dr, c - dc) and not scan(r, c - dc)) or (scan(r - dr, c + dc) and not scan(r - dr, c)):
+                return (r, c)
+            if jump_straight(r, c, dr, 0) or jump_straight(r, c, 0, dc):
+                return (r, c)
+
+    return (yield from jps8_search(start, end, cols, jump, walk, make_open_set(open_set, graph.rows * cols), counters))
+
+
+def jps8_search(start, end, cols, jump, walk, queue, counters=None):
+    """A* over 8-direction jump points, pruning directions by the parent's move.
+
+    With `counters`, each direction kept after pruning counts as one
+    neighbor examined.
+    """
+    _start_tally(counters)
+    visited = set()
+    g_cost = {start: 0}
+    parents = {}
+
+    def pruned_dirs(r, c):
+        parent = parents.get((r, c))
+        if parent is None:
+            return DIRS_8
+        dr, dc = _sign(r - parent[0]), _sign(c - parent[1])
+        found = []
+        if dr and dc:
+            if walk(r + dr, c):
+                found.append((dr, 0))
+            if walk(r, c + dc):
+                found.append((0, dc))
+            found.append((dr, dc))
+            if not walk(r, c - dc):
+                found.append((dr, -dc))
+            if not walk(r - dr, c):
+                found.append((-dr, dc))
+        elif dr:
+            found.append((dr, 0))
+            if not walk(r, c + 1):
+                found.append((dr, 1))
+            if not walk(r, c - 1):
+                found.append((dr, -1))
+        else:
+            found.append((0, dc))
+            if not walk(r + 1, c):
+                found.append((1, dc))
+            if not walk(r - 1, c):
+                found.append((-1, dc))
+        return found
+
+    queue.push(start[0] * cols + start[1], chebyshev_distance(start, end), 0)
+
+    while queue:
+        current = divmod(queue.pop()[1], cols)
+        if current in visited:
+            continue
+        visited.add(current)
+        r, c = current
+        yield VISIT, r * cols + c
+
+        if current == end:
+            path = reconstruct_path(parents, start, end)
+            yield from _emit_path(path, cols)
+            return SearchResult(len(visited), path, queue.stats())
+
+        directions = pruned_dirs(r, c)
+        if counters is not None:
+            counters["neighbors"] += len(directions)
+        for dr, dc in directions:
+            jp = jump(r, c, dr, dc)
+            if jp and jp not in visited:
+                new_cost = g_cost[current] + chebyshev_distance(current, jp)
+                if jp not in g_cost or new_cost < g_cost[jp]:
+                    g_cost[jp] = new_cost
+                    queue.push(jp[0] * cols + jp[1], new_cost + chebyshev_distance(jp, end), new_cost)
+                    parents[jp] = current
+                    yield PUSH, jp[0] * cols + jp[1]
+
+    return None
+
+
+SOLVERS = {
+    "BFS": bfs_steps,
+    "Bi BFS": bidirectional_bfs_steps,
+    "Bi A*": bidirectional_a_star_steps,
+    "DFS": dfs_steps,
+    "A*": a_star_steps,
+    "JPS": jps_steps,
+    "Wavefront": wavefront_steps,
+    "Bitset BFS": bitset_steps,
+    "LPA*": lpa_star_steps,
+    "JPS+": jps_plus_steps,
+    "Dijkstra": dijkstra_steps,
+    "HPA*": hpa_steps,
+}
+
+# Solvers with an event-free implementation that solve() prefers.
+DIRECT_SOLVERS = {
+    "Wavefront": wavefront_bfs,
+    "Bitset BFS": bitset_bfs,
+}
+
+
+def open_set_options(algorithm, open_set):
+    """Keyword options running `algorithm` on the open set named `open_set` (see maze.queues).
+
+    Empty when open_set is None or the solver has no open set to choose,
+    so the result can be passed to any solver.
+    """
+    if open_set is not None and "open_set" in inspect.signature(SOLVERS[algorithm]).parameters:
+        return {"open_set": open_set}
+    return {}
+
+
+def run_steps(steps):
+    """Drain a step generator without rendering and return its SearchResult."""
+    advance = steps.__next__
+    try:
+        while True:
+            advance()
+    except StopIteration as done:
+        return done.value
+
+
+def solve(algorithm, grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance, **options):
+    """Run a solver headlessly. Returns a SearchResult, or None if no path exists.
+
+    Extra keyword options go to the solver, e.g. open_set="bucket" for A*
+    and the JPS variants (see maze.queues). Endpoints in different regions
+    are answered from the grid's component index without searching.
+    """
+    try:
+        solver = SOLVERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm: {algorithm}") from None
+    if not reachable(grid, start, end, dirs):
+        return None
+    direct = DIRECT_SOLVERS.get(algorithm)
+    if direct is not None:
+        return direct(grid, start, end, dirs, heuristic, **options)
+    return run_steps(solver(grid, start, end, dirs, heuristic, **options))
@@ -0,0 +1,168 @@
+"""Search traces: one run's painted step events with timestamps, in a binary file.
+
+A trace holds everything a replay needs: the maze, the endpoints and the
+events, so replaying never runs a solver. File layout, little-endian,
+every section padded to 8 bytes:
+
+    header   HEADER: magic, rows, cols, start r/c, end r/c, event count, name length
+    name     algorithm name, UTF-8
+    cells    rows * cols bytes, 0 open / 1 wall
+    costs    rows * cols bytes of terrain cost
+    events   count int32, pack_event(kind, index)
+    times    count uint64, microseconds of solver time when the event was emitted
+
+load_trace() memory-maps the file and reads the events and times through
+memoryviews, so a trace of millions of events opens at once and only
+the pages a replay touches are read.
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_right
+
+from maze.events import record_events, unpack_event
+from maze.solvers import SOLVERS
+from maze.utils import DIRS_4, manhattan_distance
+
+TRACE_DIR = "traces"
+TRACE_SUFFIX = ".mztrace"
+MAGIC = b"MZTRACE2"
+HEADER = struct.Struct("<8s8I")
+
+
+def _padded(size):
+    return -size % 8
+
+
+class Trace:
+    """A recorded run: events (packed int32) and times (uint64 microseconds), equal length.
+
+    `events` and `times` are arrays for a fresh recording or memoryviews
+    over the file for a loaded one; close() releases the file.
+    """
+
+    def __init__(self, algorithm, rows, cols, start, end, cells, costs, events, times):
+        if len(events) != len(times):
+            raise ValueError("a trace needs one timestamp per event")
+        self.algorithm = algorithm
+        self.rows, self.cols = rows, cols
+        self.start, self.end = tuple(start), tuple(end)
+        self.cells, self.costs = cells, costs
+        self.events, self.times = events, times
+        self._map = None
+        self._views = []
+
+    def __len__(self):
+        return len(self.events)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def duration(self):
+        """Solver seconds covered by the trace."""
+        return self.times[-1] / 1e6 if len(self.times) else 0.0
+
+    def event(self, position):
+        """(kind, index) of the event at `position`."""
+        return unpack_event(self.events[position])
+
+    def time(self, position):
+        return self.times[position] / 1e6
+
+    def position_at(self, seconds):
+        """Number of events emitted up to `seconds` of solver time."""
+        return bisect_right(self.times, int(seconds * 1e6))
+
+    def close(self):
+        if self._map is not None:
+            for view in reversed(self._views):
+                view.release()
+            self._views = []
+            self._map.close()
+            self._map = None
+
+
+def record_trace(algorithm, grid, start, end, dirs=DIRS_4, heuristic=manhattan_distance, **options):
+    """Run `algorithm` once, headless, and return (SearchResult or None, Trace); options go to the solver."""
+    times = array("Q")
+    steps = SOLVERS[algorithm](grid, start, end, dirs, heuristic, **options)
+    result, events = record_events(steps, start, end, grid.cols, times)
+    return result, Trace(algorithm, grid.rows, grid.cols, start, end,
+                         bytes(grid.cells), bytes(grid.costs), events, times)
+
+
+def save_trace(path, trace):
+    """Write `trace` to `path`, creating its directory; returns the path."""
+    name = trace.algorithm.encode()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    header = HEADER.pack(MAGIC, trace.rows, trace.cols, *trace.start, *trace.end, len(trace), len(name))
+    with open(path, "wb") as f:
+        f.write(header)
+        for section in (name, bytes(trace.cells), bytes(trace.costs)):
+            f.write(section)
+            f.write(bytes(_padded(len(section))))
+        for column, code in ((trace.events, "i"), (trace.times, "Q")):
+            values = column if isinstance(column, array) else array(code, column)
+            if sys.byteorder != "little":
+                values = array(code, values)
+                values.byteswap()
+            f.write(values.tobytes())
+            f.write(bytes(_padded(len(values) * values.itemsize)))
+    return path
+
+
+def load_trace(path):
+    """Open a saved trace, memory-mapped; close() it (or use `with`) when done."""
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    views = [memoryview(data)]
+    try:
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is not a maze trace")
+        magic, rows, cols, sr, sc, er, ec, count, name_length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a maze trace")
+        offset = HEADER.size
+        name = bytes(data[offset:offset + name_length]).decode()
+        offset += name_length + _padded(name_length)
+        size = rows * cols
+        sections = []
+        for length, padding in ((size, _padded(size)), (size, _padded(size)), (4 * count, _padded(4 * count)), (8 * count, 0)):
+            if offset + length > len(data):
+                raise ValueError(f"{path} is truncated")
+            sections.append(views[0][offset:offset + length])
+            offset += length + padding
+        views += sections
+        cells, costs, events, times = sections
+        if sys.byteorder == "little":
+            events, times = events.cast("i"), times.cast("Q")
+            views += [events, times]
+        else:
+            # big-endian hosts get swapped copies instead of views
+            events, times = array("i", events.tobytes()), array("Q", times.tobytes())
+            events.byteswap()
+            times.byteswap()
+    except Exception:
+        for view in reversed(views):
+            view.release()
+        data.close()
+        raise
+
+    trace = Trace(name, rows, cols, (sr, sc), (er, ec), cells, costs, events, times)
+    trace._map, trace._views = data, views
+    return trace
+
+
+def trace_path(algorithm, directory=TRACE_DIR):
+    """A fresh file name for a trace of `algorithm` in `directory`."""
+    slug = "".join(ch if ch.isalnum() else "-" for ch in algorithm.replace("*", "star").lower()).strip("-")
+    return os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug or 'run'}{TRACE_SUFFIX}")
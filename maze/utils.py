@@ -1,6 +1,4 @@
 # utils.py
-import time
-
 
 BACKGROUND_COLOR = "#F0F0F0"
 
@@ -16,34 +14,29 @@ DIRS_8 = [
 ]
 
 
-
-def draw_cell(canvas, rectangles, r, c, color):
-    canvas.itemconfig(rectangles[r][c], fill=color)
-
-def reset_canvas_colors(rows, cols, rectangles, canvas, start, end, skip_colors=(WALL_COLOR, START_COLOR, END_COLOR)):
-    for r in range(rows):
-        for c in range(cols):
-            pos = (r, c)
-            current_color = canvas.itemcget(rectangles[r][c], "fill")
-            if pos != start and pos != end and current_color not in skip_colors:
-                draw_cell(canvas, rectangles, r, c, BACKGROUND_COLOR)
-            canvas.itemconfig(rectangles[r][c], outline="", width=0)
+def reset_canvas_colors(cells, canvas, start, end, color_of=lambda index: BACKGROUND_COLOR):
+    """Wipe a run off a cell surface (maze.cells): repaint the cells touched
+    since the last bulk repaint with color_of(index), keeping the endpoints."""
+    skip = {r * cells.cols + c for r, c in filter(None, (start, end))}
+    cells.restore(color_of, skip)
     canvas.update()
 
-def is_in_bounds(r, c, rows, cols):
-    return 0 <= r < rows and 0 <= c < cols
-
 def manhattan_distance(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 def chebyshev_distance(a, b):
     return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
 
-
-def delay_step(canvas, delay_var):
-    canvas.update()
-    delay = delay_var.get() / 1000
-    if delay > 0:
-        time.sleep(delay)
-
-        
\ No newline at end of file
+def load_numpy():
+    """numpy, imported on first use (it is optional and slow to import), or None when missing."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def movement(move_mode):
+    """Directions and matching heuristic for a "4" or "8" move mode."""
+    if move_mode == "8":
+        return DIRS_8, chebyshev_distance
+    return DIRS_4, manhattan_distance
@@ -0,0 +1,146 @@
+from maze.utils import DIRS_4, load_numpy
+from maze.events import PUSH, PATH, SearchResult
+
+
+def _require_numpy():
+    np = load_numpy()
+    if np is None:
+        raise RuntimeError("numpy is required for the wavefront BFS")
+    return np
+
+
+def _as_array(grid):
+    if hasattr(grid, "array"):
+        return grid.array
+    np = _require_numpy()
+    return np.asarray(grid, dtype=np.uint8)
+
+
+class _Wavefront:
+    """Level-synchronous BFS over a wall-padded, flattened grid.
+
+    The whole frontier is expanded per level with vectorized gathers: every
+    frontier index plus every direction offset, masked by the open cells that
+    have no distance yet. Keeping the frontier as an index array instead of a
+    full-grid mask makes each level cost O(frontier) rather than O(grid).
+    """
+
+    def __init__(self, grid, start, dirs):
+        np = _require_numpy()
+        cells = _as_array(grid)
+        rows, cols = cells.shape
+        width = cols + 2
+        self.rows, self.cols, self.width = rows, cols, width
+        self.dirs = tuple(dirs)
+        self.deltas = np.array([dr * width + dc for dr, dc in dirs], dtype=np.int64)
+
+        is_open = np.zeros((rows + 2, width), dtype=bool)
+        is_open[1:-1, 1:-1] = cells == 0
+        self.open = is_open.ravel()
+        self.dist = np.full((rows + 2) * width, -1, dtype=np.int32)
+        self.owner = np.zeros((rows + 2) * width, dtype=np.int64)
+
+        source = (start[0] + 1) * width + start[1] + 1
+        self.dist[source] = 0
+        self.frontier = np.array([source], dtype=np.int64)
+        self.level = 0
+
+    def expand(self):
+        """Advance one level. Returns the padded indexes reached, or None when exhausted."""
+        candidates = (self.frontier[:, None] + self.deltas[None, :]).ravel()
+        candidates = candidates[self.open[candidates]]
+        candidates = candidates[self.dist[candidates] < 0]
+        if not candidates.size:
+            self.frontier = candidates
+            return None
+
+        # drop duplicates (cells reached from several frontier cells) in O(n)
+        order = _require_numpy().arange(candidates.size)
+        self.owner[candidates] = order
+        candidates = candidates[self.owner[candidates] == order]
+
+        self.level += 1
+        self.dist[candidates] = self.level
+        self.frontier = candidates
+        return candidates
+
+    def distance(self, cell):
+        return self.dist[(cell[0] + 1) * self.width + cell[1] + 1]
+
+    def field(self):
+        return self.dist.reshape(self.rows + 2, self.width)[1:-1, 1:-1].copy()
+
+    def path_to(self, end):
+        """Walk down the distance field from end; returns (r, c) cells from start to end."""
+        dist, width = self.dist, self.width
+        i = (end[0] + 1) * width + end[1] + 1
+        d = dist[i]
+        path = [end]
+        while d > 0:
+            for delta in self.deltas.tolist():
+                if dist[i - delta] == d - 1:
+                    i -= delta
+                    break
+            d -= 1
+            r, c = divmod(i, width)
+            path.append((r - 1, c - 1))
+        path.reverse()
+        return path
+
+
+def distance_field(grid, start, dirs=DIRS_4):
+    """BFS distances from start to every cell as a (rows, cols) int32 array; -1 is unreachable."""
+    _require_numpy()
+    wave = _Wavefront(grid, start, dirs)
+    while wave.expand() is not None:
+        pass
+    return wave.field()
+
+
+def path_from_field(dist, end, dirs=DIRS_4):
+    """Shortest path to end read back from a distance_field() result, or None."""
+    _require_numpy()
+    r, c = end
+    if dist[r, c] < 0:
+        return None
+    rows, cols = dist.shape
+    d = dist[r, c]
+    path = [end]
+    while d > 0:
+        for dr, dc in dirs:
+            pr, pc = r - dr, c - dc
+            if 0 <= pr < rows and 0 <= pc < cols and dist[pr, pc] == d - 1:
+                r, c = pr, pc
+                break
+        d -= 1
+        path.append((r, c))
+    path.reverse()
+    return path
+
+
+def wavefront_bfs(grid, start, end, dirs=DIRS_4, heuristic=None):
+    """Headless wavefront BFS that stops at the level reaching end."""
+    np = _require_numpy()
+    wave = _Wavefront(grid, start, dirs)
+    while wave.distance(end) < 0:
+        if wave.expand() is None:
+            return None
+    return SearchResult(int(np.count_nonzero(wave.dist >= 0)), wave.path_to(end))
+
+
+def wavefront_steps(grid, start, end, dirs=DIRS_4, heuristic=None):
+    """Step-event version of wavefront_bfs: one PUSH per cell, level by level."""
+    np = _require_numpy()
+    wave = _Wavefront(grid, start, dirs)
+    cols, width = wave.cols, wave.width
+    while wave.distance(end) < 0:
+        reached = wave.expand()
+        if reached is None:
+            return None
+        for index in (reached - width + 1 - 2 * (reached // width)).tolist():
+            yield PUSH, index
+
+    path = wave.path_to(end)
+    for r, c in path:
+        yield PATH, r * cols + c
+    return SearchResult(int(np.count_nonzero(wave.dist >= 0)), path)
@@ -0,0 +1,77 @@
+from array import array
+
+from maze.events import VISIT, PUSH, PATH, SearchResult
+from maze.graph import graph_for
+from maze.queues import make_open_set
+from maze.utils import DIRS_4
+
+_UNSEEN = 2 ** 63 - 1
+
+
+def path_cost(grid, path):
+    """Weighted cost of walking `path`: every step pays the cost of the cell it enters.
+
+    Equals the path length on grids without a terrain layer.
+    """
+    costs = getattr(grid, "costs", None)
+    if costs is None:
+        return max(len(path) - 1, 0)
+    cols = len(grid[0])
+    return sum(costs[r * cols + c] for r, c in path[1:])
+
+
+def _padded_costs(grid, graph):
+    """Step costs in the graph's wall-padded layout (1 everywhere for plain grids)."""
+    step = bytearray([1]) * graph.size
+    costs = getattr(grid, "costs", None)
+    if costs is not None:
+        cols, width = graph.cols, graph.width
+        for r in range(graph.rows):
+            base = (r + 1) * width + 1
+            step[base:base + cols] = costs[r * cols:(r + 1) * cols]
+    return step
+
+
+def dijkstra_steps(grid, start, end, dirs=DIRS_4, heuristic=None, open_set="radix", counters=None):
+    """Dijkstra over the grid's terrain costs (see Grid.set_cost); `heuristic` is ignored.
+
+    Distances only grow as nodes are settled, so the default open set is
+    the monotone radix heap from maze.queues. The path minimizes
+    path_cost(), not the number of steps.
+    """
+    graph = graph_for(grid, dirs)
+    offsets, targets, index = graph.offsets, graph.targets, graph.index
+    source, target = graph.node(*start), graph.node(*end)
+    step = _padded_costs(grid, graph)
+    if counters is not None:
+        counters.setdefault("neighbors", 0)
+
+    queue = make_open_set(open_set, graph.size)
+    push, pop = queue.push, queue.pop
+    dist = array("q", [_UNSEEN]) * graph.size
+    parents = array("i", [-1]) * graph.size
+    dist[source] = 0
+    push(source, 0)
+    settled = 0
+
+    while queue:
+        d, i = pop()
+        if i == target:
+            path = graph.trace(parents, source, target)
+            for r, c in path:
+                yield PATH, r * graph.cols + c
+            return SearchResult(settled, path, queue.stats())
+
+        settled += 1
+        yield VISIT, index(i)
+        if counters is not None:
+            counters["neighbors"] += offsets[i + 1] - offsets[i]
+        for j in targets[offsets[i]:offsets[i + 1]]:
+            nd = d + step[j]
+            if nd < dist[j]:
+                dist[j] = nd
+                parents[j] = i
+                push(j, nd)
+                yield PUSH, index(j)
+
+    return None